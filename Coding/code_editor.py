@@ -17,6 +17,10 @@ except Exception:  # Fallback for environments without support module
     def normalize_dax_measure_completion(completion):
         return completion, False
 
+# Typed characters used to pick a completion bucket; longer prefixes are left to QCompleter.
+_COMPLETION_KEY_LENGTH = 3
+
+
 class CodeEditor(QPlainTextEdit):
     """Lightweight code editor with QCompleter-based autocompletion.
 
@@ -38,6 +42,11 @@ class CodeEditor(QPlainTextEdit):
         super().__init__(parent)
         self._completer: QCompleter | None = None
         self._completer_model: QStringListModel | None = None
+        # Full completion vocabulary as (lowercased, word) plus the candidate lists already
+        # narrowed per typed key, so the popup filters a short list instead of every word.
+        self._completion_entries: list[tuple[str, str]] = []
+        self._completion_buckets: dict[str, list[tuple[str, str]]] = {}
+        self._completion_key: str | None = None
         self._function_names: set[str] = set()
         self._highlighter = None
         self._highlighter_enabled = True
@@ -65,6 +74,9 @@ class CodeEditor(QPlainTextEdit):
                 pass
 
         self._completer_model = None
+        self._completion_entries = []
+        self._completion_buckets = {}
+        self._completion_key = None
         self._completer = completer
         if self._completer:
             # Anchor popup to the editor widget
@@ -82,6 +94,7 @@ class CodeEditor(QPlainTextEdit):
                 model = self._completer.model()
                 if isinstance(model, QStringListModel):
                     self._completer_model = model
+                    self._completion_entries = [(word.lower(), word) for word in model.stringList()]
             except Exception:
                 pass
 
@@ -153,10 +166,12 @@ class CodeEditor(QPlainTextEdit):
         if definition.highlighter_cls and self._highlighter_enabled:
             try:
                 self._highlighter = definition.highlighter_cls(self.document())
-                try:
-                    self._highlighter.rehighlight()
-                except Exception:
-                    pass
+                # New editors start empty; the highlighter formats text as it is set.
+                if not self.document().isEmpty():
+                    try:
+                        self._highlighter.rehighlight()
+                    except Exception:
+                        pass
             except Exception:
                 self._highlighter = None
         else:
@@ -367,6 +382,8 @@ class CodeEditor(QPlainTextEdit):
         pos = tc.position()
         anchor = pos - len(prefix)
         self._active_completion_anchor = anchor if anchor >= 0 else 0
+        if c is self._completer:
+            self._narrow_completions(prefix)
         c.setCompletionPrefix(prefix)
         if not prefix and not allow_empty:
             c.popup().hide()
@@ -389,6 +406,28 @@ class CodeEditor(QPlainTextEdit):
             # Fallback: let completer place itself
             c.complete()
 
+    def _narrow_completions(self, prefix: str):
+        """Load the completer model with only the words that can match ``prefix``."""
+        model = self._completer_model
+        if model is None or not self._completion_entries:
+            return
+        key = prefix.lower()[:_COMPLETION_KEY_LENGTH]
+        if key == self._completion_key:
+            return
+        model.setStringList([word for _, word in self._completion_candidates(key)])
+        self._completion_key = key
+
+    def _completion_candidates(self, key: str) -> list[tuple[str, str]]:
+        # Every word containing `key` also contains key[:-1], so each bucket is carved out of
+        # the shorter key's bucket rather than the whole vocabulary.
+        if not key:
+            return self._completion_entries
+        bucket = self._completion_buckets.get(key)
+        if bucket is None:
+            bucket = [entry for entry in self._completion_candidates(key[:-1]) if key in entry[0]]
+            self._completion_buckets[key] = bucket
+        return bucket
+
     def _move_selected_lines(self, direction: int) -> bool:
         cursor = self.textCursor()
         doc = self.document()
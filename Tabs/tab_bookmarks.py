@@ -1,9 +1,10 @@
 import json
 import os
+import secrets
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Set
+from typing import Callable, Dict, List, Optional, Set, Tuple
 
-from PyQt6.QtCore import Qt, QPoint
+from PyQt6.QtCore import Qt, QPoint, QTimer
 from PyQt6.QtGui import QBrush, QColor, QIcon, QImage, QKeySequence, QPixmap, QShortcut
 from PyQt6.QtWidgets import (
     QAbstractItemView,
@@ -16,12 +17,75 @@ from PyQt6.QtWidgets import (
     QPushButton,
     QTreeWidget,
     QTreeWidgetItem,
+    QTreeWidgetItemIterator,
     QVBoxLayout,
     QWidget,
 )
 
-from common_functions import APP_THEME, PBIPProject, load_pbip_project, simple_hash
-import random
+from common_functions import (
+    APP_THEME,
+    PBIPProject,
+    dump_json_text,
+    find_names_in_file,
+    load_pbip_project,
+)
+
+try:
+    import ahocorasick
+except ImportError:  # pragma: no cover - optional dependency
+    ahocorasick = None
+
+ITEM_TYPE_ROLE = Qt.ItemDataRole.UserRole + 1
+ITEM_ID_ROLE = Qt.ItemDataRole.UserRole + 2
+ITEM_FOLDED_ROLE = Qt.ItemDataRole.UserRole + 10
+ITEM_BOOKMARK = "bookmark"
+ITEM_FOLDER = "folder"
+ITEM_PLACEHOLDER = "placeholder"
+NEW_FOLDER_NAME = "New Folder"
+_NEW_FOLDER_FOLDED = NEW_FOLDER_NAME.casefold()
+
+
+def _item_type(item: QTreeWidgetItem) -> Optional[str]:
+    """Return the item kind cached on the wrapper, falling back to the data role."""
+    try:
+        return item._pbic_type
+    except AttributeError:
+        return item.data(0, ITEM_TYPE_ROLE)
+
+
+def _item_id(item: QTreeWidgetItem) -> Optional[str]:
+    """Return the folder/bookmark id cached on the wrapper, falling back to the data role."""
+    try:
+        return item._pbic_id
+    except AttributeError:
+        return item.data(0, ITEM_ID_ROLE)
+
+
+def _build_filter_matcher(pattern: str) -> Callable[[str], bool]:
+    """Return a predicate telling whether a casefolded label contains every term of ``pattern``."""
+    tokens = list(dict.fromkeys(pattern.split()))
+    if len(tokens) <= 1:
+        return lambda folded: pattern in folded
+
+    if ahocorasick is None:
+        return lambda folded: all(token in folded for token in tokens)
+
+    automaton = ahocorasick.Automaton()
+    for token in tokens:
+        automaton.add_word(token, token)
+    automaton.make_automaton()
+    needed = len(tokens)
+
+    def matches(folded: str) -> bool:
+        found: Set[str] = set()
+        for _, token in automaton.iter(folded):
+            found.add(token)
+            if len(found) == needed:
+                return True
+        return False
+
+    return matches
+
 
 @dataclass
 class BookmarkMeta:
@@ -38,24 +102,31 @@ class BookmarkTreeWidget(QTreeWidget):
     def __init__(self, parent_tab: "TabBookmarks"):
         super().__init__(parent_tab)
         self._tab = parent_tab
+        self._drag_has_folder = False
+
+    def dragEnterEvent(self, event):
+        # The selection is frozen for the duration of a drag, so inspect it once here
+        # instead of on every move event.
+        self._drag_has_folder = any(_item_type(item) == ITEM_FOLDER for item in self.selectedItems())
+        super().dragEnterEvent(event)
 
     def dropEvent(self, event):
         super().dropEvent(event)
+        self._drag_has_folder = False
         self._tab.on_tree_structure_changed()
 
     def dragMoveEvent(self, event):
         target = self.itemAt(event.position().toPoint())
         indicator = self.dropIndicatorPosition()
-        dragged_types = {item.data(0, TabBookmarks.ITEM_TYPE_ROLE) for item in self.selectedItems()}
 
         if target is not None:
-            target_type = target.data(0, TabBookmarks.ITEM_TYPE_ROLE)
+            target_type = _item_type(target)
 
             if indicator == QAbstractItemView.DropIndicatorPosition.OnItem:
-                if target_type == TabBookmarks.ITEM_BOOKMARK:
+                if target_type in (ITEM_BOOKMARK, ITEM_PLACEHOLDER):
                     event.ignore()
                     return
-                if target_type == TabBookmarks.ITEM_FOLDER and TabBookmarks.ITEM_FOLDER in dragged_types:
+                if target_type == ITEM_FOLDER and self._drag_has_folder:
                     # prevent nesting folders
                     event.ignore()
                     return
@@ -71,10 +142,12 @@ class BookmarkTreeWidget(QTreeWidget):
 class TabBookmarks(QWidget):
     """Bookmarks tab that surfaces bookmark metadata in a tree view."""
 
-    ITEM_TYPE_ROLE = Qt.ItemDataRole.UserRole + 1
-    ITEM_ID_ROLE = Qt.ItemDataRole.UserRole + 2
-    ITEM_BOOKMARK = "bookmark"
-    ITEM_FOLDER = "folder"
+    ITEM_TYPE_ROLE = ITEM_TYPE_ROLE
+    ITEM_ID_ROLE = ITEM_ID_ROLE
+    ITEM_FOLDED_ROLE = ITEM_FOLDED_ROLE
+    ITEM_BOOKMARK = ITEM_BOOKMARK
+    ITEM_FOLDER = ITEM_FOLDER
+    ITEM_PLACEHOLDER = ITEM_PLACEHOLDER
 
     def __init__(self, project: Optional[PBIPProject] = None, pbip_file: Optional[str] = None):
         super().__init__()
@@ -83,10 +156,18 @@ class TabBookmarks(QWidget):
         self.bookmarks: Dict[str, BookmarkMeta] = {}
         self.folders: Dict[str, dict] = {}
         self.structure: List[dict] = []
+        self._lazy_folders: Set[str] = set()
+        self._item_index: Dict[Tuple[str, str], QTreeWidgetItem] = {}
+        self._last_filter_pattern = ""
+        self._last_structure_sig: Optional[tuple] = None
+        self._folder_displays_folded: Dict[str, int] = {}
+        self._next_new_folder_index = 2
         self.dirty = False
         self._loading = False
         self._suppress_dirty = False
         self._ignore_item_changed = False
+        self._usage_width_dirty = False
+        self._usage_width_scheduled = False
         self.summary_label: QLabel | None = None
 
         self.folder_icon = self._load_icon("Folder.svg")
@@ -170,7 +251,12 @@ class TabBookmarks(QWidget):
         self.filter_input = QLineEdit()
         self.filter_input.setPlaceholderText("Filter bookmarks...")
         self.filter_input.setClearButtonEnabled(False)
-        self.filter_input.textChanged.connect(self.apply_filter)
+        # Coalesce bursts of keystrokes into a single filter pass.
+        self._filter_timer = QTimer(self)
+        self._filter_timer.setSingleShot(True)
+        self._filter_timer.setInterval(80)
+        self._filter_timer.timeout.connect(self.apply_filter)
+        self.filter_input.textChanged.connect(lambda _text: self._filter_timer.start())
         self.filter_input.setFixedWidth(220)
         secondary_row.addWidget(self.filter_input)
 
@@ -193,6 +279,8 @@ class TabBookmarks(QWidget):
         header.setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
         header.setSectionResizeMode(1, QHeaderView.ResizeMode.ResizeToContents)
         self.tree.setAlternatingRowColors(True)
+        # Every row is a single line of text, so let the view skip per-row size hints.
+        self.tree.setUniformRowHeights(True)
         self.tree.setRootIsDecorated(True)
         self.tree.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
         self.tree.setEditTriggers(
@@ -205,6 +293,7 @@ class TabBookmarks(QWidget):
         self.tree.setDragDropMode(QTreeWidget.DragDropMode.InternalMove)
         self.tree.itemSelectionChanged.connect(self.update_actions_state)
         self.tree.itemChanged.connect(self.on_item_changed)
+        self.tree.itemExpanded.connect(self._lazy_populate)
         try:
             self.tree.model().rowsMoved.connect(self.on_tree_structure_changed)
         except Exception:
@@ -268,9 +357,13 @@ class TabBookmarks(QWidget):
         metadata = None
         self._loading = True
         self.tree.clear()
+        self._item_index.clear()
         self.bookmarks.clear()
         self.folders.clear()
         self.structure.clear()
+        self._lazy_folders.clear()
+        self._last_structure_sig = None
+        self._rebuild_folder_displays()
         warnings: List[str] = []
         self.tree.setEnabled(True)
 
@@ -308,6 +401,7 @@ class TabBookmarks(QWidget):
 
         warnings = list(metadata.warnings)
         self.folders = dict(metadata.folders)
+        self._rebuild_folder_displays()
         self.structure = list(metadata.structure)
 
         self.bookmarks = {}
@@ -322,10 +416,15 @@ class TabBookmarks(QWidget):
 
         raw_items = metadata.items or []
 
+        bookmarks = self.bookmarks
+        folders = self.folders
+        tree = self.tree
+        add_bookmark_item = self.add_bookmark_item
         bookmarks_in_tree: Set[str] = set()
+        mark_in_tree = bookmarks_in_tree.add
         bookmarks_in_folders = {
             child
-            for folder in self.folders.values()
+            for folder in folders.values()
             for child in folder.get("children", [])
             if isinstance(child, str)
         }
@@ -339,45 +438,50 @@ class TabBookmarks(QWidget):
 
             if "children" in entry:
                 folder_item = self.create_folder_item(name)
-                self.tree.addTopLevelItem(folder_item)
-                for child_name in self.folders.get(name, {}).get("children", []):
+                tree.addTopLevelItem(folder_item)
+                # Child items are only materialized when the folder is first expanded.
+                has_children = False
+                for child_name in folders.get(name, {}).get("children", []):
                     if not isinstance(child_name, str):
                         continue
-                    self.add_bookmark_item(child_name, folder_item)
-                    bookmarks_in_tree.add(child_name)
-                folder_item.setExpanded(True)
+                    if child_name not in bookmarks:
+                        bookmarks[child_name] = self._missing_bookmark_meta(child_name)
+                    mark_in_tree(child_name)
+                    has_children = True
+                if has_children:
+                    self._add_lazy_placeholder(folder_item)
+                    self._lazy_folders.add(name)
             else:
                 if name in bookmarks_in_folders:
                     continue
-                self.add_bookmark_item(name, None)
-                bookmarks_in_tree.add(name)
+                add_bookmark_item(name, None)
+                mark_in_tree(name)
 
-        for name in sorted(set(self.bookmarks.keys()) - bookmarks_in_tree, key=lambda n: self.bookmarks[n].display_name.casefold()):
-            self.add_bookmark_item(name, None)
+        for name in sorted(bookmarks.keys() - bookmarks_in_tree, key=lambda n: bookmarks[n].display_name.casefold()):
+            add_bookmark_item(name, None)
 
         if warnings:
             self.update_status("; ".join(warnings), warning=True)
         else:
             self.update_status("", warning=False)
 
-        self.tree.expandToDepth(0)
         self.mark_dirty(False, force=True)
         self._loading = False
         self._suppress_dirty = True
         self.on_tree_structure_changed()
         self.apply_filter()
         self.update_actions_state()
-        if not self._loading:
-            self._adjust_usage_column_width()
+
     def _compute_bookmark_usage(self):
-        for meta in self.bookmarks.values():
+        bookmarks = self.bookmarks
+        for meta in bookmarks.values():
             meta.used = False
 
         pages_dir = self.pages_definition_dir()
         if not pages_dir or not os.path.isdir(pages_dir):
             return
 
-        remaining: Set[str] = set(self.bookmarks.keys())
+        remaining: Set[str] = set(bookmarks)
         if not remaining:
             return
 
@@ -385,17 +489,14 @@ class TabBookmarks(QWidget):
             for fname in files:
                 if not fname.lower().endswith(".json"):
                     continue
-                path = os.path.join(root, fname)
                 try:
-                    with open(path, "r", encoding="utf-8", errors="ignore") as fh:
-                        content = fh.read()
+                    matched = find_names_in_file(os.path.join(root, fname), remaining)
                 except Exception:
                     continue
 
-                matched = {name for name in remaining if name in content}
                 if matched:
                     for name in matched:
-                        self.bookmarks[name].used = True
+                        bookmarks[name].used = True
                     remaining.difference_update(matched)
                     if not remaining:
                         return
@@ -435,7 +536,7 @@ class TabBookmarks(QWidget):
             selected = sum(
                 1
                 for item in self.tree.selectedItems()
-                if item.data(0, self.ITEM_TYPE_ROLE) == self.ITEM_BOOKMARK
+                if _item_type(item) == self.ITEM_BOOKMARK
             )
 
         parts = [f"Bookmarks: {total} total", f"{unused} unused"]
@@ -449,6 +550,9 @@ class TabBookmarks(QWidget):
         item = QTreeWidgetItem([display, ""])
         item.setData(0, self.ITEM_TYPE_ROLE, self.ITEM_FOLDER)
         item.setData(0, self.ITEM_ID_ROLE, folder_id)
+        item._pbic_type = self.ITEM_FOLDER
+        item._pbic_id = folder_id
+        item.setData(0, self.ITEM_FOLDED_ROLE, display.casefold())
         flags = (
             Qt.ItemFlag.ItemIsEnabled
             | Qt.ItemFlag.ItemIsSelectable
@@ -459,23 +563,28 @@ class TabBookmarks(QWidget):
         item.setFlags(flags)
         if self.folder_icon and not self.folder_icon.isNull():
             item.setIcon(0, self.folder_icon)
+        self._item_index[(self.ITEM_FOLDER, folder_id)] = item
         return item
 
-    def add_bookmark_item(self, bookmark_id: str, parent: Optional[QTreeWidgetItem]):
+    @staticmethod
+    def _missing_bookmark_meta(bookmark_id: str) -> BookmarkMeta:
+        return BookmarkMeta(
+            display_name=f"{bookmark_id} (missing)",
+            path=None,
+            valid=False,
+            used=False,
+            error="Missing bookmark file.",
+        )
+
+    def add_bookmark_item(self, bookmark_id: str, parent: Optional[QTreeWidgetItem], index: Optional[int] = None):
         meta = self.bookmarks.get(bookmark_id)
         if meta is None:
-            display = f"{bookmark_id} (missing)"
-            item = QTreeWidgetItem([display, ""])
+            meta = self._missing_bookmark_meta(bookmark_id)
+            self.bookmarks[bookmark_id] = meta
+        if meta.path is None and not meta.valid:
+            item = QTreeWidgetItem([meta.display_name, ""])
             item.setFlags(Qt.ItemFlag.ItemIsSelectable)
             item.setToolTip(0, "Bookmark file not found.")
-            meta = BookmarkMeta(
-                display_name=display,
-                path=None,
-                valid=False,
-                used=False,
-                error="Missing bookmark file.",
-            )
-            self.bookmarks[bookmark_id] = meta
         else:
             display = meta.display_name
             item = QTreeWidgetItem([display, ""])
@@ -490,18 +599,60 @@ class TabBookmarks(QWidget):
 
         item.setData(0, self.ITEM_TYPE_ROLE, self.ITEM_BOOKMARK)
         item.setData(0, self.ITEM_ID_ROLE, bookmark_id)
+        item._pbic_type = self.ITEM_BOOKMARK
+        item._pbic_id = bookmark_id
+        item.setData(0, self.ITEM_FOLDED_ROLE, meta.display_name.casefold())
+        self._item_index[(self.ITEM_BOOKMARK, bookmark_id)] = item
 
         self._apply_usage_style(item, meta)
 
         if parent is None:
             self.tree.addTopLevelItem(item)
-        else:
+        elif index is None:
             parent.addChild(item)
+        else:
+            parent.insertChild(index, item)
 
         if not self._loading:
-            self._adjust_usage_column_width()
+            self._schedule_usage_column_width()
+
+    def _add_lazy_placeholder(self, folder_item: QTreeWidgetItem):
+        placeholder = QTreeWidgetItem(["Loading...", ""])
+        placeholder.setData(0, self.ITEM_TYPE_ROLE, self.ITEM_PLACEHOLDER)
+        placeholder._pbic_type = self.ITEM_PLACEHOLDER
+        placeholder._pbic_id = None
+        placeholder.setFlags(Qt.ItemFlag.NoItemFlags)
+        folder_item.addChild(placeholder)
+
+    def _lazy_populate(self, folder_item: QTreeWidgetItem):
+        folder_id = _item_id(folder_item)
+        if folder_id not in self._lazy_folders:
+            return
+        self._lazy_folders.discard(folder_id)
+
+        # Items dropped into the folder before it was expanded keep their place around the placeholder.
+        insert_at = folder_item.childCount()
+        for idx in range(folder_item.childCount()):
+            if _item_type(folder_item.child(idx)) == self.ITEM_PLACEHOLDER:
+                folder_item.takeChild(idx)
+                insert_at = idx
+                break
+
+        for child_name in self.folders.get(folder_id, {}).get("children", []):
+            if not isinstance(child_name, str):
+                continue
+            self.add_bookmark_item(child_name, folder_item, insert_at)
+            insert_at += 1
+
+    def _populate_all_folders(self):
+        if not self._lazy_folders:
+            return
+        root = self.tree.invisibleRootItem()
+        for idx in range(root.childCount()):
+            self._lazy_populate(root.child(idx))
 
     def _apply_usage_style(self, item: QTreeWidgetItem, meta: Optional[BookmarkMeta]):
+        self._usage_width_dirty = True
         if meta is None:
             item.setText(1, "")
             item.setForeground(1, QBrush())
@@ -527,9 +678,24 @@ class TabBookmarks(QWidget):
         header.setSectionResizeMode(column, QHeaderView.ResizeMode.Interactive)
         header.resizeSection(column, int(width * 2))
 
+    def _schedule_usage_column_width(self):
+        # Coalesce bursts of insertions into a single layout pass on the next event loop turn.
+        if self._usage_width_scheduled:
+            return
+        self._usage_width_scheduled = True
+        QTimer.singleShot(0, self._flush_usage_column_width)
+
+    def _flush_usage_column_width(self):
+        self._usage_width_scheduled = False
+        if not self._usage_width_dirty:
+            return
+        self._usage_width_dirty = False
+        self._adjust_usage_column_width()
+
 
     # --- Actions ----------------------------------------------------------
     def select_all_items(self):
+        self._populate_all_folders()
         self.tree.selectAll()
 
     def unselect_all_items(self):
@@ -537,10 +703,12 @@ class TabBookmarks(QWidget):
         self.update_actions_state()
 
     def select_not_used_items(self):
+        self._populate_all_folders()
+        bookmarks = self.bookmarks
+
         def traverse(item: QTreeWidgetItem):
-            if item.data(0, self.ITEM_TYPE_ROLE) == self.ITEM_BOOKMARK:
-                bookmark_id = item.data(0, self.ITEM_ID_ROLE)
-                meta = self.bookmarks.get(bookmark_id)
+            if _item_type(item) == ITEM_BOOKMARK:
+                meta = bookmarks.get(_item_id(item))
                 if meta and not meta.used:
                     item.setSelected(True)
             for idx in range(item.childCount()):
@@ -565,8 +733,9 @@ class TabBookmarks(QWidget):
             QMessageBox.critical(self, "Save Failed", "Bookmarks folder for this PBIP project could not be located.")
             return
 
+        self._populate_all_folders()
         try:
-            snapshot, folder_displays, bookmark_display, seen_bookmarks, seen_folders = self._collect_tree_snapshot()
+            snapshot, folder_displays, bookmark_display, seen_bookmarks, seen_folders = self._rebuild_from_tree(validate=True)
         except ValueError as exc:
             QMessageBox.warning(self, "Cannot Save", str(exc))
             return
@@ -599,8 +768,9 @@ class TabBookmarks(QWidget):
         warnings: List[str] = []
 
         try:
+            payload = dump_json_text(bookmarks_json)
             with open(bookmarks_json_path, "w", encoding="utf-8") as fh:
-                json.dump(bookmarks_json, fh, indent=4, ensure_ascii=False)
+                fh.write(payload)
                 fh.write("\n")
         except Exception as exc:
             QMessageBox.critical(self, "Save Failed", f"Failed to write bookmarks.json:\n{exc}")
@@ -625,8 +795,9 @@ class TabBookmarks(QWidget):
             bookmark_json["displayName"] = display
 
             try:
+                payload = dump_json_text(bookmark_json)
                 with open(bookmark_path, "w", encoding="utf-8") as fh:
-                    json.dump(bookmark_json, fh, indent=4, ensure_ascii=False)
+                    fh.write(payload)
                     fh.write("\n")
             except Exception as exc:
                 warnings.append(f"Failed to write {bookmark_id}.bookmark.json: {exc}")
@@ -662,6 +833,7 @@ class TabBookmarks(QWidget):
                     "display": entry["display"],
                     "children": entry["children"],
                 }
+        self._rebuild_folder_displays()
 
         self.structure = [{"type": entry["type"], "id": entry["id"]} for entry in snapshot]
 
@@ -711,6 +883,7 @@ class TabBookmarks(QWidget):
         self.load_bookmarks()
 
     def sort_current_scope(self):
+        self._populate_all_folders()
         selected_keys, current_key = self._capture_selection()
         self._loading = True
         try:
@@ -719,7 +892,7 @@ class TabBookmarks(QWidget):
 
             while self.tree.topLevelItemCount():
                 item = self.tree.takeTopLevelItem(0)
-                item_type = item.data(0, self.ITEM_TYPE_ROLE)
+                item_type = _item_type(item)
                 if item_type == self.ITEM_FOLDER:
                     self._sort_child_items(item)
                     folders.append(item)
@@ -740,6 +913,7 @@ class TabBookmarks(QWidget):
         self.apply_filter()
 
     def expand_all_items(self):
+        self._populate_all_folders()
         self.tree.expandAll()
 
     def collapse_all_items(self):
@@ -750,36 +924,48 @@ class TabBookmarks(QWidget):
         self.filter_input.setFocus()
 
     def apply_filter(self):
+        self._filter_timer.stop()
         pattern_raw = self.filter_input.text() or ""
         pattern = pattern_raw.strip().casefold()
         self.clear_filter_button.setEnabled(bool(pattern))
+        if pattern:
+            self._populate_all_folders()
+
+        previous_pattern = self._last_filter_pattern
+        self._last_filter_pattern = pattern
 
         selected_keys, current_key = self._capture_selection()
         self.tree.setUpdatesEnabled(False)
         try:
             if not pattern:
-                for item in self._iter_items():
-                    item.setHidden(False)
+                # Nothing can be hidden unless a filter was active before.
+                if previous_pattern:
+                    for item in self._iter_items():
+                        item.setHidden(False)
             else:
+                matches = _build_filter_matcher(pattern)
                 for i in range(self.tree.topLevelItemCount()):
                     item = self.tree.topLevelItem(i)
-                    self._apply_filter_to_item(item, pattern)
+                    self._apply_filter_to_item(item, matches)
         finally:
             self.tree.setUpdatesEnabled(True)
 
         if pattern:
-            visible_keys = set()
-            for item in self._iter_items():
-                if not item.isHidden():
-                    key = (item.data(0, self.ITEM_TYPE_ROLE), item.data(0, self.ITEM_ID_ROLE))
-                    if key[1] is not None:
-                        visible_keys.add(key)
-            selected_keys = [key for key in selected_keys if key in visible_keys]
-            if current_key and current_key not in visible_keys:
+            # Only the captured keys matter, so resolve them through the id index instead of
+            # collecting every visible item in the tree.
+            item_index = self._item_index
+
+            def is_visible(key) -> bool:
+                item = item_index.get(key)
+                return item is not None and not item.isHidden()
+
+            selected_keys = [key for key in selected_keys if is_visible(key)]
+            if current_key and not is_visible(current_key):
                 current_key = selected_keys[0] if selected_keys else None
 
         self._restore_selection(selected_keys, current_key)
         self.update_actions_state()
+        self._flush_usage_column_width()
 
     def _sort_child_items(self, parent_item: QTreeWidgetItem):
         if parent_item.childCount() <= 1:
@@ -791,92 +977,137 @@ class TabBookmarks(QWidget):
         for child in children:
             parent_item.addChild(child)
 
-    def _collect_tree_snapshot(self):
+    def _rebuild_from_tree(self, *, validate: bool):
+        """
+        Walk the top-level items once and return the tree snapshot used by both saving
+        and structure synchronization. With ``validate`` duplicate identifiers raise
+        ValueError, which is only needed before writing to disk.
+        """
         root = self.tree.invisibleRootItem()
         snapshot: List[dict] = []
         folder_displays: Dict[str, str] = {}
         bookmark_displays: Dict[str, str] = {}
         seen_folders: Set[str] = set()
         seen_bookmarks: Set[str] = set()
+        FOLDER = ITEM_FOLDER
+        BOOKMARK = ITEM_BOOKMARK
+        lazy_folders = self._lazy_folders
 
-        for idx in range(root.childCount()):
-            item = root.child(idx)
+        root_children = [root.child(i) for i in range(root.childCount())]
+        for item in root_children:
             if item is None:
                 continue
-            item_type = item.data(0, self.ITEM_TYPE_ROLE)
-            item_id = item.data(0, self.ITEM_ID_ROLE)
+            item_type = _item_type(item)
+            item_id = _item_id(item)
             if not item_id:
                 continue
 
-            if item_type == self.ITEM_FOLDER:
-                if item_id in seen_folders:
+            if item_type == FOLDER:
+                if validate and item_id in seen_folders:
                     raise ValueError(f"Duplicate folder identifier '{item_id}' detected. Please rename one of the folders before saving.")
                 seen_folders.add(item_id)
 
                 display_name = item.text(0)
                 folder_displays[item_id] = display_name
 
-                children_ids: List[str] = []
-                seen_children: Set[str] = set()
-                for child_idx in range(item.childCount()):
-                    child = item.child(child_idx)
-                    child_type = child.data(0, self.ITEM_TYPE_ROLE)
-                    child_id = child.data(0, self.ITEM_ID_ROLE)
-                    if child_type != self.ITEM_BOOKMARK or not child_id:
-                        continue
-                    if child_id in seen_children:
-                        raise ValueError(
-                            f"Folder '{display_name}' contains duplicate bookmark '{child_id}'. Adjust the order before saving."
-                        )
-                    if child_id in seen_bookmarks:
-                        raise ValueError(
-                            f"Duplicate bookmark identifier '{child_id}' detected. Bookmarks must be unique before saving."
-                        )
-                    seen_children.add(child_id)
-                    seen_bookmarks.add(child_id)
-                    children_ids.append(child_id)
-                    bookmark_displays[child_id] = child.text(0)
+                if item_id in lazy_folders and item.childCount() <= 1:
+                    # Still collapsed since load: the stored children are authoritative.
+                    children_ids = list(self.folders.get(item_id, {}).get("children", []))
+                    seen_bookmarks.update(children_ids)
+                else:
+                    if item_id in lazy_folders:
+                        self._lazy_populate(item)
+                    children_ids = []
+                    seen_children: Set[str] = set()
+                    children = [item.child(i) for i in range(item.childCount())]
+                    for child in children:
+                        child_type = _item_type(child)
+                        child_id = _item_id(child)
+                        if child_type != BOOKMARK or not child_id:
+                            continue
+                        if validate:
+                            if child_id in seen_children:
+                                raise ValueError(
+                                    f"Folder '{display_name}' contains duplicate bookmark '{child_id}'. Adjust the order before saving."
+                                )
+                            if child_id in seen_bookmarks:
+                                raise ValueError(
+                                    f"Duplicate bookmark identifier '{child_id}' detected. Bookmarks must be unique before saving."
+                                )
+                        seen_children.add(child_id)
+                        seen_bookmarks.add(child_id)
+                        children_ids.append(child_id)
+                        bookmark_displays[child_id] = child.text(0)
 
                 snapshot.append({
-                    "type": self.ITEM_FOLDER,
+                    "type": FOLDER,
                     "id": item_id,
                     "display": display_name,
                     "children": children_ids,
                 })
-            elif item_type == self.ITEM_BOOKMARK:
-                if item_id in seen_bookmarks:
+            elif item_type == BOOKMARK:
+                if validate and item_id in seen_bookmarks:
                     raise ValueError(
                         f"Duplicate bookmark identifier '{item_id}' detected. Bookmarks must be unique before saving."
                     )
                 seen_bookmarks.add(item_id)
                 bookmark_displays[item_id] = item.text(0)
                 snapshot.append({
-                    "type": self.ITEM_BOOKMARK,
+                    "type": BOOKMARK,
                     "id": item_id,
                 })
 
         return snapshot, folder_displays, bookmark_displays, seen_bookmarks, seen_folders
 
-    def _apply_filter_to_item(self, item: QTreeWidgetItem, pattern: str) -> bool:
-        matches_self = pattern in item.text(0).casefold()
-        any_child_visible = False
-        for idx in range(item.childCount()):
-            child = item.child(idx)
-            if self._apply_filter_to_item(child, pattern):
-                any_child_visible = True
-
-        is_folder = item.data(0, self.ITEM_TYPE_ROLE) == self.ITEM_FOLDER
-        visible = matches_self or any_child_visible
-        item.setHidden(not visible)
-        if is_folder:
-            item.setExpanded(bool(pattern) and (matches_self or any_child_visible))
-        return visible
+    def _apply_filter_to_item(self, item: QTreeWidgetItem, matches: Callable[[str], bool]) -> bool:
+        folded_role = self.ITEM_FOLDED_ROLE
+        folder_type = self.ITEM_FOLDER
+
+        # Pre-order walk with an explicit stack; each entry remembers its parent's slot in
+        # `order` so visibility can be combined bottom-up afterwards without recursion.
+        order: List[list] = []
+        stack: List[Tuple[QTreeWidgetItem, int]] = [(item, -1)]
+        while stack:
+            node, parent_slot = stack.pop()
+            folded = node.data(0, folded_role)
+            if folded is None:
+                folded = node.text(0).casefold()
+            matches_self = matches(folded)
+            is_folder = _item_type(node) == folder_type
+            if matches_self and is_folder:
+                # A matching folder shows its whole content; no need to test each child.
+                child_fn = node.child
+                for idx in range(node.childCount()):
+                    child_fn(idx).setHidden(False)
+                node.setHidden(False)
+                node.setExpanded(True)
+                if parent_slot >= 0:
+                    order[parent_slot][2] = True
+                else:
+                    return True
+                continue
+
+            slot = len(order)
+            order.append([node, is_folder, matches_self, parent_slot])
+            child_fn = node.child
+            for idx in range(node.childCount()):
+                stack.append((child_fn(idx), slot))
+
+        # Children always follow their parent in `order`, so walking it backwards settles
+        # every child before the parent reads its flag.
+        for node, is_folder, visible, parent_slot in reversed(order):
+            node.setHidden(not visible)
+            if is_folder:
+                node.setExpanded(visible)
+            if visible and parent_slot >= 0:
+                order[parent_slot][2] = True
+        return order[0][2]
 
     def _capture_selection(self):
         selected_keys = []
         seen = set()
         for item in self.tree.selectedItems():
-            key = (item.data(0, self.ITEM_TYPE_ROLE), item.data(0, self.ITEM_ID_ROLE))
+            key = (_item_type(item), _item_id(item))
             if key[1] is None or key in seen:
                 continue
             seen.add(key)
@@ -885,23 +1116,21 @@ class TabBookmarks(QWidget):
         current_key = None
         if current_item is not None:
             current_key = (
-                current_item.data(0, self.ITEM_TYPE_ROLE),
-                current_item.data(0, self.ITEM_ID_ROLE),
+                _item_type(current_item),
+                _item_id(current_item),
             )
         return selected_keys, current_key
 
     def _restore_selection(self, selected_keys, current_key):
-        selected_set = {key for key in selected_keys if key[1] is not None}
-        target_current = None
+        item_index = self._item_index
+        target_current = item_index.get(current_key) if current_key else None
         self.tree.blockSignals(True)
         try:
             self.tree.clearSelection()
-            for item in self._iter_items():
-                key = (item.data(0, self.ITEM_TYPE_ROLE), item.data(0, self.ITEM_ID_ROLE))
-                if key in selected_set:
+            for key in selected_keys:
+                item = item_index.get(key)
+                if item is not None:
                     item.setSelected(True)
-                if current_key and key == current_key:
-                    target_current = item
         finally:
             self.tree.blockSignals(False)
 
@@ -915,12 +1144,20 @@ class TabBookmarks(QWidget):
 
     def _iter_items(self, parent: Optional[QTreeWidgetItem] = None):
         if parent is None:
-            iterator = (self.tree.topLevelItem(i) for i in range(self.tree.topLevelItemCount()))
-        else:
-            iterator = (parent.child(i) for i in range(parent.childCount()))
-        for item in iterator:
+            # Let Qt walk the whole tree natively instead of recursing through Python generators.
+            iterator = QTreeWidgetItemIterator(self.tree)
+            item = iterator.value()
+            while item is not None:
+                yield item
+                iterator += 1
+                item = iterator.value()
+            return
+
+        stack = [parent.child(i) for i in range(parent.childCount() - 1, -1, -1)]
+        while stack:
+            item = stack.pop()
             yield item
-            yield from self._iter_items(item)
+            stack.extend(item.child(i) for i in range(item.childCount() - 1, -1, -1))
 
     def show_context_menu(self, point: QPoint):
         item = self.tree.itemAt(point)
@@ -933,7 +1170,7 @@ class TabBookmarks(QWidget):
         elif item is None:
             menu.addAction("New Folder", lambda: self.create_new_folder(None))
         else:
-            item_type = item.data(0, self.ITEM_TYPE_ROLE)
+            item_type = _item_type(item)
             if item_type == self.ITEM_FOLDER:
                 menu.addAction("Rename", self.rename_selected_item)
                 menu.addAction("New Folder", lambda: self.create_new_folder(item))
@@ -956,12 +1193,13 @@ class TabBookmarks(QWidget):
 
     def new_folder_shortcut(self):
         current = self.tree.currentItem()
-        self.create_new_folder(current if current and current.data(0, self.ITEM_TYPE_ROLE) == self.ITEM_FOLDER else None)
+        self.create_new_folder(current if current and _item_type(current) == self.ITEM_FOLDER else None)
 
     def create_new_folder(self, reference_item: Optional[QTreeWidgetItem]):
         folder_id = self.generate_folder_id()
         display_name = self.generate_folder_name()
         self.folders[folder_id] = {"display": display_name, "children": []}
+        self._track_folder_display(None, display_name)
         item = self.create_folder_item(folder_id)
 
         root = self.tree.invisibleRootItem()
@@ -975,88 +1213,90 @@ class TabBookmarks(QWidget):
         self.on_tree_structure_changed()
 
     def generate_folder_id(self) -> str:
-        existing_ids = set(self.folders.keys()) | set(self.bookmarks.keys())
         while True:
-            candidate = f"Tentacles_{simple_hash(f"Tentacles_{random.random()}")}"
-            if candidate not in existing_ids:
+            candidate = f"Tentacles_{secrets.token_hex(8)}"
+            if candidate not in self.folders and candidate not in self.bookmarks:
                 return candidate
 
     def generate_folder_name(self) -> str:
-        base = "New Folder"
-        existing = {self.folders[f]["display"] for f in self.folders}
-        if base not in existing:
+        base = NEW_FOLDER_NAME
+        folded_base = _NEW_FOLDER_FOLDED
+        existing = self._folder_displays_folded
+        if folded_base not in existing:
             return base
-        index = 2
-        while True:
-            candidate = f"{base} {index}"
-            if candidate not in existing:
-                return candidate
+        # Every "New Folder N" below the cached index is known to be taken.
+        index = self._next_new_folder_index
+        while f"{folded_base} {index}" in existing:
             index += 1
+        self._next_new_folder_index = index
+        return f"{base} {index}"
+
+    def _rebuild_folder_displays(self):
+        counts: Dict[str, int] = {}
+        for folder in self.folders.values():
+            display = folder.get("display")
+            if isinstance(display, str):
+                folded = display.casefold()
+                counts[folded] = counts.get(folded, 0) + 1
+        self._folder_displays_folded = counts
+        self._next_new_folder_index = 2
+
+    def _track_folder_display(self, old: Optional[str], new: Optional[str]):
+        if old == new:
+            return
+        counts = self._folder_displays_folded
+        if old is not None:
+            folded_old = old.casefold()
+            if counts.get(folded_old, 0) > 1:
+                counts[folded_old] -= 1
+            elif folded_old in counts:
+                del counts[folded_old]
+                prefix = f"{_NEW_FOLDER_FOLDED} "
+                suffix = folded_old[len(prefix):] if folded_old.startswith(prefix) else ""
+                # isdecimal, not isdigit: int() rejects superscripts such as "²". Numbering starts at 2.
+                if suffix.isdecimal():
+                    self._next_new_folder_index = min(self._next_new_folder_index, max(2, int(suffix)))
+        if new is not None:
+            folded_new = new.casefold()
+            counts[folded_new] = counts.get(folded_new, 0) + 1
 
     def delete_selected_item(self):
-        selected_items = list(self.tree.selectedItems())
+        selected_items = self.tree.selectedItems()
         if not selected_items:
             return
 
         selected_keys, current_key = self._capture_selection()
-        folders = [item for item in selected_items if item.data(0, self.ITEM_TYPE_ROLE) == self.ITEM_FOLDER]
-        bookmarks = [item for item in selected_items if item.data(0, self.ITEM_TYPE_ROLE) == self.ITEM_BOOKMARK]
+        folders: List[QTreeWidgetItem] = []
+        bookmarks: List[QTreeWidgetItem] = []
+        deleted_keys: Set[Tuple[str, str]] = set()
+        for item in selected_items:
+            item_type = _item_type(item)
+            if item_type == ITEM_FOLDER:
+                folders.append(item)
+            elif item_type == ITEM_BOOKMARK:
+                bookmarks.append(item)
+            else:
+                continue
+            deleted_keys.add((item_type, _item_id(item)))
 
         if not folders and not bookmarks:
             return
 
-        deleted_keys = {(self.ITEM_FOLDER, item.data(0, self.ITEM_ID_ROLE)) for item in folders}
-        deleted_keys |= {(self.ITEM_BOOKMARK, item.data(0, self.ITEM_ID_ROLE)) for item in bookmarks}
-
         if len(selected_items) == 1:
-            item = selected_items[0]
-            item_type = item.data(0, self.ITEM_TYPE_ROLE)
-            if item_type == self.ITEM_FOLDER:
-                folder_id = item.data(0, self.ITEM_ID_ROLE)
+            if folders:
                 reply = QMessageBox.question(
                     self,
                     "Delete folder?",
                     "Delete this folder? Bookmarks inside will move to the root level.",
                     QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
                 )
-                if reply != QMessageBox.StandardButton.Yes:
-                    return
-
-                children_to_restore = []
-                while item.childCount():
-                    child = item.takeChild(0)
-                    child.setExpanded(False)
-                    children_to_restore.append((child, child.isSelected()))
-                for child, was_selected in children_to_restore:
-                    self.tree.addTopLevelItem(child)
-                    child.setSelected(was_selected)
-
-                parent = item.parent()
-                if parent:
-                    parent.removeChild(item)
-                else:
-                    index = self.tree.indexOfTopLevelItem(item)
-                    if index >= 0:
-                        self.tree.takeTopLevelItem(index)
-                self.folders.pop(folder_id, None)
-            elif item_type == self.ITEM_BOOKMARK:
+            else:
                 reply = QMessageBox.question(
                     self,
                     "Remove bookmark?",
                     "Remove this bookmark from the current view? (Changes are not saved yet.)",
                     QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
                 )
-                if reply != QMessageBox.StandardButton.Yes:
-                    return
-                parent = item.parent()
-                if parent:
-                    parent.removeChild(item)
-                else:
-                    index = self.tree.indexOfTopLevelItem(item)
-                    if index >= 0:
-                        self.tree.takeTopLevelItem(index)
-            else:
-                return
         else:
             parts = []
             if folders:
@@ -1073,38 +1313,36 @@ class TabBookmarks(QWidget):
                 f"Delete the selected {detail}?{note}",
                 QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
             )
-            if reply != QMessageBox.StandardButton.Yes:
-                return
+        if reply != QMessageBox.StandardButton.Yes:
+            return
 
+        # Repaint and notify once after the whole batch instead of per moved/removed item.
+        self.tree.setUpdatesEnabled(False)
+        self.tree.blockSignals(True)
+        root = self.tree.invisibleRootItem()
+        try:
             for item in folders:
-                folder_id = item.data(0, self.ITEM_ID_ROLE)
-                children_to_restore = []
-                while item.childCount():
-                    child = item.takeChild(0)
-                    child.setExpanded(False)
-                    children_to_restore.append((child, child.isSelected()))
-                for child, was_selected in children_to_restore:
-                    self.tree.addTopLevelItem(child)
-                    child.setSelected(was_selected)
-
-                parent = item.parent()
-                if parent:
-                    parent.removeChild(item)
-                else:
-                    index = self.tree.indexOfTopLevelItem(item)
-                    if index >= 0:
-                        self.tree.takeTopLevelItem(index)
-                self.folders.pop(folder_id, None)
-
-            for item in bookmarks:
-                parent = item.parent()
-                if parent:
-                    parent.removeChild(item)
-                else:
-                    index = self.tree.indexOfTopLevelItem(item)
-                    if index >= 0:
-                        self.tree.takeTopLevelItem(index)
+                folder_id = _item_id(item)
+                self._lazy_populate(item)
+                children = item.takeChildren()
+                # Only the selected children need re-selecting once re-homed; no per-child pairs.
+                reselect = [child for child in children if child.isSelected()]
+                # Re-home the whole batch in one call instead of one addTopLevelItem per child.
+                root.addChildren(children)
+                for child in reselect:
+                    child.setSelected(True)
+
+                removed = self.folders.pop(folder_id, None)
+                if removed is not None:
+                    self._track_folder_display(removed.get("display"), None)
+
+            self._take_items(folders + bookmarks)
+        finally:
+            self.tree.blockSignals(False)
+            self.tree.setUpdatesEnabled(True)
 
+        for key in deleted_keys:
+            self._item_index.pop(key, None)
         selected_keys = [key for key in selected_keys if key not in deleted_keys]
         if current_key in deleted_keys:
             current_key = None
@@ -1114,6 +1352,20 @@ class TabBookmarks(QWidget):
         self.on_tree_structure_changed()
         self.apply_filter()
 
+    def _take_items(self, items: List[QTreeWidgetItem]):
+        # Resolve each sibling index once, then detach from the highest index down so the
+        # remaining indices stay valid without rescanning the sibling lists.
+        root = self.tree.invisibleRootItem()
+        positioned = []
+        for item in items:
+            container = item.parent() or root
+            index = container.indexOfChild(item)
+            if index >= 0:
+                positioned.append((index, container))
+        positioned.sort(key=lambda entry: entry[0], reverse=True)
+        for index, container in positioned:
+            container.takeChild(index)
+
     def move_item(self, direction: int):
         item = self.tree.currentItem()
         if item is None:
@@ -1126,9 +1378,15 @@ class TabBookmarks(QWidget):
             return
 
         self._loading = True
-        container.takeChild(index)
-        container.insertChild(target, item)
-        self._loading = False
+        self.tree.setUpdatesEnabled(False)
+        self.tree.blockSignals(True)
+        try:
+            container.takeChild(index)
+            container.insertChild(target, item)
+        finally:
+            self.tree.blockSignals(False)
+            self.tree.setUpdatesEnabled(True)
+            self._loading = False
         self.tree.setCurrentItem(item)
         self.on_tree_structure_changed()
 
@@ -1142,29 +1400,36 @@ class TabBookmarks(QWidget):
         if not text:
             # restore previous text
             self._ignore_item_changed = True
-            if item.data(0, self.ITEM_TYPE_ROLE) == self.ITEM_FOLDER:
-                folder_id = item.data(0, self.ITEM_ID_ROLE)
+            if _item_type(item) == self.ITEM_FOLDER:
+                folder_id = _item_id(item)
                 previous = self.folders.get(folder_id, {}).get("display", folder_id)
                 item.setText(0, previous)
             else:
-                bookmark_id = item.data(0, self.ITEM_ID_ROLE)
+                bookmark_id = _item_id(item)
                 previous = self.bookmarks.get(
                     bookmark_id,
                     BookmarkMeta(display_name=bookmark_id, path=None, valid=False),
                 ).display_name
                 item.setText(0, previous)
+            item.setData(0, self.ITEM_FOLDED_ROLE, previous.casefold())
             self._ignore_item_changed = False
             return
 
-        item_type = item.data(0, self.ITEM_TYPE_ROLE)
+        self._ignore_item_changed = True
+        item.setData(0, self.ITEM_FOLDED_ROLE, item.text(0).casefold())
+        self._ignore_item_changed = False
+
+        item_type = _item_type(item)
         if item_type == self.ITEM_FOLDER:
-            folder_id = item.data(0, self.ITEM_ID_ROLE)
+            folder_id = _item_id(item)
             if folder_id in self.folders:
+                self._track_folder_display(self.folders[folder_id].get("display"), text)
                 self.folders[folder_id]["display"] = text
             else:
+                self._track_folder_display(None, text)
                 self.folders[folder_id] = {"display": text, "children": []}
         elif item_type == self.ITEM_BOOKMARK:
-            bookmark_id = item.data(0, self.ITEM_ID_ROLE)
+            bookmark_id = _item_id(item)
             meta = self.bookmarks.get(bookmark_id)
             if meta:
                 meta.display_name = text
@@ -1172,54 +1437,54 @@ class TabBookmarks(QWidget):
         self.on_tree_structure_changed()
         self.apply_filter()
 
+    def _structure_signature(self) -> tuple:
+        root = self.tree.invisibleRootItem()
+        signature = []
+        for i in range(root.childCount()):
+            item = root.child(i)
+            children = tuple(_item_id(item.child(c)) for c in range(item.childCount()))
+            signature.append((_item_type(item), _item_id(item), children))
+        return tuple(signature)
+
     def on_tree_structure_changed(self, *args, **kwargs):
         if self._loading:
             return
 
-        self._loading = True
         should_mark_dirty = not self._suppress_dirty
-        try:
-            root = self.tree.invisibleRootItem()
-            new_structure: List[dict] = []
-            new_folders_children: Dict[str, List[str]] = {}
+        signature = self._structure_signature()
+        if signature == self._last_structure_sig:
+            # Ordering and membership are unchanged (e.g. a rename, which on_item_changed
+            # already synced), so skip rebuilding the folder/structure bookkeeping.
+            self._suppress_dirty = False
+            if should_mark_dirty:
+                self.mark_dirty(True)
+            return
+        self._last_structure_sig = signature
 
-            for i in range(root.childCount()):
-                item = root.child(i)
-                item_type = item.data(0, self.ITEM_TYPE_ROLE)
-                item_id = item.data(0, self.ITEM_ID_ROLE)
+        self._loading = True
+        try:
+            snapshot, _, bookmark_displays, _, _ = self._rebuild_from_tree(validate=False)
 
-                if item_type == self.ITEM_FOLDER:
-                    # Ensure folders remain top-level
-                    if item.parent():
-                        parent = item.parent()
-                        parent.removeChild(item)
-                        root.insertChild(i, item)
-                    folder_display = item.text(0)
-                    folder_data = self.folders.setdefault(item_id, {"display": folder_display, "children": []})
+            for entry in snapshot:
+                if entry["type"] != self.ITEM_FOLDER:
+                    continue
+                folder_id = entry["id"]
+                folder_display = entry["display"]
+                folder_data = self.folders.get(folder_id)
+                if folder_data is None:
+                    self.folders[folder_id] = {"display": folder_display, "children": entry["children"]}
+                    self._track_folder_display(None, folder_display)
+                else:
+                    self._track_folder_display(folder_data.get("display"), folder_display)
                     folder_data["display"] = folder_display
+                    folder_data["children"] = entry["children"]
+
+            for bookmark_id, display in bookmark_displays.items():
+                meta = self.bookmarks.get(bookmark_id)
+                if meta:
+                    meta.display_name = display
 
-                    children_ids: List[str] = []
-                    for c_idx in range(item.childCount()):
-                        child = item.child(c_idx)
-                        child_id = child.data(0, self.ITEM_ID_ROLE)
-                        child_type = child.data(0, self.ITEM_TYPE_ROLE)
-                        if child_type == self.ITEM_BOOKMARK and child_id:
-                            children_ids.append(child_id)
-                    new_folders_children[item_id] = children_ids
-                    new_structure.append({"type": self.ITEM_FOLDER, "id": item_id})
-                elif item_type == self.ITEM_BOOKMARK:
-                    bookmark_id = item_id
-                    meta = self.bookmarks.get(bookmark_id)
-                    if meta:
-                        meta.display_name = item.text(0)
-                    new_structure.append({"type": self.ITEM_BOOKMARK, "id": bookmark_id})
-
-            # Update folder membership
-            for folder_id, children in new_folders_children.items():
-                self.folders.setdefault(folder_id, {"display": folder_id, "children": []})
-                self.folders[folder_id]["children"] = children
-
-            self.structure = new_structure
+            self.structure = [{"type": entry["type"], "id": entry["id"]} for entry in snapshot]
         finally:
             self._loading = False
             self._suppress_dirty = False
@@ -1236,6 +1501,7 @@ class TabBookmarks(QWidget):
                 self.pbip_file = str(self.project.pbip_path)
             except Exception as exc:
                 self.tree.clear()
+                self._item_index.clear()
                 self.tree.setEnabled(False)
                 self.update_status(f"Failed to load PBIP project: {exc}", warning=True)
                 self.mark_dirty(False, force=True)
@@ -1244,6 +1510,7 @@ class TabBookmarks(QWidget):
             self.load_bookmarks()
         else:
             self.tree.clear()
+            self._item_index.clear()
             self.tree.setEnabled(False)
             self.update_status("Select a PBIP file to view bookmarks.", warning=False)
             self.mark_dirty(False, force=True)
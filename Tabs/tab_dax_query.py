@@ -1,32 +1,96 @@
 import os
-import json
-from typing import Optional
+import hashlib
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Set, Tuple
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QListWidget,
     QListWidgetItem, QSplitter, QMessageBox, QLabel, QMenu, QAbstractItemView
 )
-from PyQt6.QtCore import Qt, QPoint
+from PyQt6.QtCore import Qt, QObject, QPoint, QRunnable, QThreadPool, pyqtSignal
 from PyQt6.QtGui import (
     QFont, QIcon, QDragEnterEvent, QDropEvent, QShortcut, QKeySequence
 )
 from Coding.code_editor import CodeEditor
-from common_functions import code_editor_font, PBIPProject, load_pbip_project
+from common_functions import code_editor_font, dump_json_text, load_json_text, PBIPProject, load_pbip_project
 
 
 INVALID_FILENAME_CHARS = set('<>:"/\\|?*')
+# Deletes every invalid character, so a length change means the name contained one.
+_INVALID_FILENAME_TABLE = str.maketrans("", "", "".join(INVALID_FILENAME_CHARS))
+_DAX_WRITE_WORKERS = 8
+# Large enough that a typical query or daxQueries.json goes out in a single write call.
+_WRITE_BUFFER_SIZE = 64 * 1024
+QUERY_ITEM_FLAGS = (
+    Qt.ItemFlag.ItemIsSelectable
+    | Qt.ItemFlag.ItemIsEnabled
+    | Qt.ItemFlag.ItemIsDragEnabled
+    | Qt.ItemFlag.ItemIsEditable
+)
+
+
+def _code_digest(code: str) -> bytes:
+    return hashlib.blake2b(code.encode("utf-8"), digest_size=16).digest()
+
+
+class DAXQuerySaveSignals(QObject):
+    finished = pyqtSignal(object)
+    error = pyqtSignal(str)
+
+
+class DAXQuerySaveWorker(QRunnable):
+    def __init__(self, fn, *args, **kwargs):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = DAXQuerySaveSignals()
+
+    def run(self):
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except Exception as exc:  # pragma: no cover - defensive
+            self.signals.error.emit(str(exc))
+        else:
+            self.signals.finished.emit(result)
 
 
 class DAXQueryTab(QWidget):
+    # Created by the first tab, once a QApplication exists; fromTheme hits the icon theme each call.
+    _STAR_ICON: Optional[QIcon] = None
+    _NO_ICON: Optional[QIcon] = None
+
     def __init__(self, project: Optional[PBIPProject] = None, pbip_file: Optional[str] = None):
         super().__init__()
+        if DAXQueryTab._STAR_ICON is None:
+            DAXQueryTab._STAR_ICON = QIcon.fromTheme("star")
+            DAXQueryTab._NO_ICON = QIcon()
         self.project = project
         self.pbip_file = str(project.pbip_path) if project else pbip_file
+        # DAXQueries folder and daxQueries.json for the pbip_file they were derived from.
+        self._paths_source: Optional[str] = None
+        self._root_dir = ""
+        self._json_path = ""
         self.default_query = None
+        # List item currently showing the star, so a default change restyles two rows only.
+        self._default_item: Optional[QListWidgetItem] = None
         self.queries = {}
+        # Queries whose .dax file must be (re)written on the next save.
+        self._dirty_names: Set[str] = set()
+        # Digest of each query's text as it is on disk, to skip rewriting identical files.
+        self._code_hash: Dict[str, bytes] = {}
+        # Next index to try per generate_unique_name base; indices are never reused.
+        self._name_counters: Dict[str, int] = {}
+        # Lowercased query names, kept in step with self.queries for duplicate checks.
+        self._names_lower: Set[str] = set()
         self.ignore_item_changes = False
         self.renaming_item = None
         self.renaming_original_name = ""
         self.ignore_editor_changes = False
+        # Query whose text is shown in the editor; pending edits are committed to it.
+        self._editing_query_name: Optional[str] = None
+        self.thread_pool = QThreadPool.globalInstance()
+        self._save_worker: Optional[DAXQuerySaveWorker] = None
         self.init_ui()
         if not self.project and self.pbip_file:
             try:
@@ -76,6 +140,8 @@ class DAXQueryTab(QWidget):
         self.query_list.setAcceptDrops(True)
         self.query_list.setDropIndicatorShown(True)
         self.query_list.setAlternatingRowColors(True)
+        # Every row is a single line of text, so the view can size them all from the first one.
+        self.query_list.setUniformItemSizes(True)
         self.query_list.setDragDropMode(QListWidget.DragDropMode.InternalMove)
         self.query_list.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
         self.query_list.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
@@ -111,7 +177,9 @@ class DAXQueryTab(QWidget):
             self.query_editor.setTabStopDistance(space_w * 4)
         except Exception:
             pass
-        self.query_editor.textChanged.connect(self.on_text_changed)
+        # The document holds the text being edited; it is copied into self.queries only when
+        # the selection moves, the query is renamed or the changes are saved.
+        self.query_editor.document().modificationChanged.connect(self.on_text_changed)
         right_layout.addWidget(self.query_editor)
 
         self.multi_selection_label = QLabel("Multiple queries selected. Editor is disabled.")
@@ -218,6 +286,8 @@ class DAXQueryTab(QWidget):
 
     def load_queries(self):
         """Load DAX queries from the PBIP file."""
+        # Reloading discards unsaved edits, including the one still held by the editor.
+        self._editing_query_name = None
         if not self.project and self.pbip_file:
             try:
                 self.project = load_pbip_project(self.pbip_file)
@@ -230,12 +300,17 @@ class DAXQueryTab(QWidget):
             QMessageBox.information(self, "No PBIP", "Select a PBIP file to load DAX queries.")
             return
 
-        metadata = self.project.get_dax_queries_metadata()
+        # Read-only use: the tab copies what it keeps, so the cached bundle need not be cloned.
+        metadata = self.project.get_dax_queries_metadata(clone=False)
         if metadata.error:
             QMessageBox.warning(self, "Error", f"Failed to load queries:\n{metadata.error}")
             self.queries = {}
+            self._dirty_names.clear()
+            self._code_hash.clear()
+            self._names_lower.clear()
             self.default_query = None
             self.ignore_item_changes = True
+            self._default_item = None
             self.query_list.clear()
             self.ignore_item_changes = False
             self.on_selection_changed()
@@ -246,13 +321,27 @@ class DAXQueryTab(QWidget):
         tab_order.extend(sorted(extras, key=str.casefold))
 
         self.queries = {name: metadata.queries.get(name, "") for name in tab_order}
+        self._dirty_names.clear()
+        self._code_hash = {name: _code_digest(code) for name, code in metadata.queries.items()}
+        self._name_counters.clear()
+        self._names_lower = {name.lower() for name in self.queries}
         self.default_query = metadata.default_tab
 
+        # Fill the list in one pass with repaints and per-row signals held back.
         self.ignore_item_changes = True
-        self.query_list.clear()
-        for name in tab_order:
-            self.query_list.addItem(self.create_query_item(name))
-        self.ignore_item_changes = False
+        self.query_list.setUpdatesEnabled(False)
+        self.query_list.blockSignals(True)
+        try:
+            self._default_item = None
+            self.query_list.clear()
+            create_item = self.create_query_item
+            add_item = self.query_list.addItem
+            for name in tab_order:
+                add_item(create_item(name))
+        finally:
+            self.query_list.blockSignals(False)
+            self.query_list.setUpdatesEnabled(True)
+            self.ignore_item_changes = False
 
         if self.query_list.count() > 0:
             self.query_list.setCurrentRow(0)
@@ -261,11 +350,14 @@ class DAXQueryTab(QWidget):
 
     def on_selection_changed(self):
         """Handle query selection changes."""
+        self._flush_text_change()
         selected_items = self.query_list.selectedItems()
+        self._editing_query_name = None
 
         if len(selected_items) == 1:
             item = selected_items[0]
             query_name = self.get_item_name(item)
+            self._editing_query_name = query_name
             self.ignore_editor_changes = True
             self.query_editor.setPlainText(self.queries.get(query_name, ""))
             self.ignore_editor_changes = False
@@ -287,20 +379,28 @@ class DAXQueryTab(QWidget):
             self.multi_selection_label.setVisible(False)
             #self.default_btn.setEnabled(False)
 
-    def on_text_changed(self):
-        """Handle query text changes."""
-        if self.ignore_editor_changes:
+    def on_text_changed(self, modified: bool):
+        """Enable Save as soon as the editor diverges from the stored query text."""
+        if modified and not self.ignore_editor_changes and self._editing_query_name is not None:
+            self.save_button.setEnabled(True)
+
+    def _flush_text_change(self):
+        """Store the editor text for the query being edited, if it was modified."""
+        query_name = self._editing_query_name
+        if query_name is None or query_name not in self.queries:
             return
 
-        current = self.query_list.currentItem()
-        if not current or len(self.query_list.selectedItems()) != 1:
+        document = self.query_editor.document()
+        if not document.isModified():
             return
+        self.ignore_editor_changes = True
+        document.setModified(False)
+        self.ignore_editor_changes = False
 
-        query_name = self.get_item_name(current)
         new_text = self.query_editor.toPlainText()
-
         if new_text != self.queries.get(query_name):
             self.queries[query_name] = new_text
+            self._dirty_names.add(query_name)
             self.save_button.setEnabled(True)
 
     def on_query_order_changed(self, *args, **kwargs):
@@ -310,12 +410,7 @@ class DAXQueryTab(QWidget):
     def create_query_item(self, name: str) -> QListWidgetItem:
         """Create a QListWidgetItem configured for the query list."""
         item = QListWidgetItem()
-        item.setFlags(
-            Qt.ItemFlag.ItemIsSelectable
-            | Qt.ItemFlag.ItemIsEnabled
-            | Qt.ItemFlag.ItemIsDragEnabled
-            | Qt.ItemFlag.ItemIsEditable
-        )
+        item.setFlags(QUERY_ITEM_FLAGS)
         self.update_item_display(item, name)
         return item
 
@@ -325,11 +420,15 @@ class DAXQueryTab(QWidget):
         self.ignore_item_changes = True
         item.setData(Qt.ItemDataRole.UserRole, name)
         item.setData(Qt.ItemDataRole.EditRole, name)
+        # Plain attribute mirror of UserRole so get_item_name skips the QVariant round-trip.
+        item._query_name = name
         if name == self.default_query:
-            item.setIcon(QIcon.fromTheme("star"))
-            item.setText(f"{name} ⭐")
+            self._default_item = item
+            item.setIcon(DAXQueryTab._STAR_ICON)
+            # Icon themes are mostly absent on Windows; fall back to marking the text.
+            item.setText(f"{name} ⭐" if DAXQueryTab._STAR_ICON.isNull() else name)
         else:
-            item.setIcon(QIcon())
+            item.setIcon(DAXQueryTab._NO_ICON)
             item.setText(name)
         self.ignore_item_changes = previous_ignore_state
 
@@ -345,10 +444,10 @@ class DAXQueryTab(QWidget):
 
     def get_item_name(self, item: QListWidgetItem) -> str:
         """Return the underlying query name for the given list item."""
-        stored = item.data(Qt.ItemDataRole.UserRole)
-        if isinstance(stored, str) and stored:
-            return stored
-        return item.text().replace(" ⭐", "")
+        try:
+            return item._query_name
+        except AttributeError:
+            return item.data(Qt.ItemDataRole.UserRole) or ""
 
     def rename_selected_query(self):
         """Begin in-place renaming of the selected query."""
@@ -380,7 +479,7 @@ class DAXQueryTab(QWidget):
             self.cancel_rename()
             return
 
-        if any(char in INVALID_FILENAME_CHARS for char in new_name):
+        if len(new_name.translate(_INVALID_FILENAME_TABLE)) != len(new_name):
             QMessageBox.warning(
                 self,
                 "Invalid Name",
@@ -392,8 +491,7 @@ class DAXQueryTab(QWidget):
 
         new_name_lower = new_name.lower()
         original_lower = self.renaming_original_name.lower()
-        existing_names_lower = {name.lower() for name in self.queries if name.lower() != original_lower}
-        if new_name_lower in existing_names_lower:
+        if new_name_lower != original_lower and new_name_lower in self._names_lower:
             QMessageBox.warning(self, "Duplicate Name", f"A query named '{new_name}' already exists.")
             self.update_item_display(item, self.renaming_original_name)
             self.cancel_rename()
@@ -404,14 +502,19 @@ class DAXQueryTab(QWidget):
             self.cancel_rename()
             return
 
-        # Preserve insertion order while renaming the key
-        reordered_queries = {}
-        for name, code in self.queries.items():
-            if name == self.renaming_original_name:
-                reordered_queries[new_name] = code
-            else:
-                reordered_queries[name] = code
-        self.queries = reordered_queries
+        self._flush_text_change()
+        if self._editing_query_name == self.renaming_original_name:
+            self._editing_query_name = new_name
+
+        # The list widget owns the query order, so the code map can be re-keyed in place.
+        self.queries[new_name] = self.queries.pop(self.renaming_original_name, "")
+
+        self._dirty_names.discard(self.renaming_original_name)
+        self._dirty_names.add(new_name)
+        # The file is written under its new name, so the old digest no longer applies.
+        self._code_hash.pop(self.renaming_original_name, None)
+        self._names_lower.discard(original_lower)
+        self._names_lower.add(new_name_lower)
 
         if self.default_query == self.renaming_original_name:
             self.default_query = new_name
@@ -440,6 +543,8 @@ class DAXQueryTab(QWidget):
         """Add a new query with a unique default name."""
         new_name = self.generate_unique_name("New_Query_")
         self.queries[new_name] = ""
+        self._dirty_names.add(new_name)
+        self._names_lower.add(new_name.lower())
 
         item = self.create_query_item(new_name)
         self.query_list.addItem(item)
@@ -474,10 +579,15 @@ class DAXQueryTab(QWidget):
         if confirm != QMessageBox.StandardButton.Yes:
             return
 
-        rows = sorted((self.query_list.row(item), item) for item in selected_items)
+        # One pass over the list instead of a linear row() lookup per selected item.
+        positions = {id(self.query_list.item(i)): i for i in range(self.query_list.count())}
+        rows = sorted(((positions[id(item)], item) for item in selected_items), key=lambda entry: entry[0])
         for row, item in reversed(rows):
             name = self.get_item_name(item)
             self.queries.pop(name, None)
+            self._dirty_names.discard(name)
+            self._code_hash.pop(name, None)
+            self._names_lower.discard(name.lower())
             self.query_list.takeItem(row)
 
         self.ensure_default_query()
@@ -497,30 +607,39 @@ class DAXQueryTab(QWidget):
         if not selected_items:
             return
 
-        rows = [self.query_list.row(item) for item in selected_items]
+        positions = {id(self.query_list.item(i)): i for i in range(self.query_list.count())}
+        rows = [positions[id(item)] for item in selected_items]
         if direction < 0 and min(rows) == 0:
             return
         if direction > 0 and max(rows) == self.query_list.count() - 1:
             return
 
         current_item = self.query_list.currentItem()
-        ordered_items = sorted(selected_items, key=lambda item: self.query_list.row(item))
+        ordered_items = [item for _, item in sorted(zip(rows, selected_items), key=lambda entry: entry[0])]
         if direction > 0:
             ordered_items.reverse()
 
-        for item in ordered_items:
-            row = self.query_list.row(item)
-            self.query_list.takeItem(row)
-            self.query_list.insertItem(row + direction, item)
+        # The same items end up selected, so hold repaints and selection signals until the
+        # whole batch is moved instead of reloading the editor after every take/insert.
+        self.query_list.setUpdatesEnabled(False)
+        self.query_list.blockSignals(True)
+        try:
+            for item in ordered_items:
+                row = self.query_list.row(item)
+                self.query_list.takeItem(row)
+                self.query_list.insertItem(row + direction, item)
 
-        self.query_list.clearSelection()
-        for item in selected_items:
-            item.setSelected(True)
+            self.query_list.clearSelection()
+            for item in selected_items:
+                item.setSelected(True)
 
-        if current_item in selected_items:
-            self.query_list.setCurrentItem(current_item)
-        elif selected_items:
-            self.query_list.setCurrentItem(selected_items[0])
+            if current_item in selected_items:
+                self.query_list.setCurrentItem(current_item)
+            elif selected_items:
+                self.query_list.setCurrentItem(selected_items[0])
+        finally:
+            self.query_list.blockSignals(False)
+            self.query_list.setUpdatesEnabled(True)
 
         self.save_button.setEnabled(True)
 
@@ -576,19 +695,22 @@ class DAXQueryTab(QWidget):
             self.on_selection_changed()
             return
 
-        existing_names = {self.get_item_name(self.query_list.item(i)) for i in range(self.query_list.count())}
-        if self.default_query not in existing_names:
-            self.default_query = self.get_item_name(self.query_list.item(0))
-        self.refresh_item_displays()
+        default_item = self._default_item
+        if default_item is None or default_item.listWidget() is not self.query_list:
+            # The starred row was deleted; only the row taking over needs restyling.
+            first_item = self.query_list.item(0)
+            self.default_query = self.get_item_name(first_item)
+            self.update_item_display(first_item, self.default_query)
         self.on_selection_changed()
 
     def generate_unique_name(self, base: str) -> str:
         """Generate a unique query name using the provided base string."""
-        existing_lower = {name.lower() for name in self.queries}
-        index = 1
+        existing_lower = self._names_lower
+        index = self._name_counters.get(base, 1)
         while True:
             candidate = f"{base}{index}"
             if candidate.lower() not in existing_lower:
+                self._name_counters[base] = index + 1
                 return candidate
             index += 1
 
@@ -603,57 +725,178 @@ class DAXQueryTab(QWidget):
         if query_name == self.default_query:
             return
 
+        previous_item = self._default_item
         self.default_query = query_name
-        self.refresh_item_displays()
+        if previous_item is not None and previous_item.listWidget() is self.query_list:
+            self.update_item_display(previous_item, self.get_item_name(previous_item))
+        self.update_item_display(item, query_name)
         self.save_button.setEnabled(True)
 
+    def _query_paths(self):
+        """Return the DAXQueries folder and daxQueries.json path, derived once per PBIP file."""
+        if self._paths_source != self.pbip_file:
+            self._root_dir = os.path.splitext(self.pbip_file)[0] + ".SemanticModel/DAXQueries"
+            self._json_path = os.path.join(self._root_dir, ".pbi", "daxQueries.json")
+            self._paths_source = self.pbip_file
+        return self._root_dir, self._json_path
+
     def save_changes(self):
         """Save changes to the queries."""
-        if not self.pbip_file:
+        if not self.pbip_file or self._save_worker is not None:
             return
+        self._flush_text_change()
 
-        root_dir = os.path.splitext(self.pbip_file)[0] + ".SemanticModel/DAXQueries"
-        json_path = os.path.join(root_dir, ".pbi", "daxQueries.json")
-
-        try:
-            new_query_order = []
-            for i in range(self.query_list.count()):
-                item_name = self.get_item_name(self.query_list.item(i))
-                new_query_order.append(item_name)
-
-            if not new_query_order:
-                QMessageBox.warning(self, "No Queries", "There are no queries to save.")
-                return
-
-            if not self.default_query or self.default_query not in new_query_order:
-                self.default_query = new_query_order[0]
-                self.refresh_item_displays()
-
-            with open(json_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-
-            data["tabOrder"] = new_query_order
-            data["defaultTab"] = self.default_query
+        root_dir, json_path = self._query_paths()
 
-            with open(json_path, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=4, ensure_ascii=False)
+        new_query_order = []
+        for i in range(self.query_list.count()):
+            item_name = self.get_item_name(self.query_list.item(i))
+            new_query_order.append(item_name)
 
-            os.makedirs(root_dir, exist_ok=True)
+        if not new_query_order:
+            QMessageBox.warning(self, "No Queries", "There are no queries to save.")
+            return
 
-            # Remove existing .dax files before writing the updated set
-            for filename in os.listdir(root_dir):
-                if filename.lower().endswith(".dax"):
-                    os.remove(os.path.join(root_dir, filename))
+        if not self.default_query or self.default_query not in new_query_order:
+            self.default_query = new_query_order[0]
+            self.refresh_item_displays()
+
+        # The disk work runs on the shared thread pool against a snapshot, so the window stays
+        # responsive on slow or synced folders while the files are written.
+        snapshot = dict(self.queries)
+        dirty_names = set(self._dirty_names)
+        default_query = self.default_query
+        worker = DAXQuerySaveWorker(
+            _write_dax_queries,
+            root_dir,
+            json_path,
+            new_query_order,
+            default_query,
+            snapshot,
+            dirty_names,
+            dict(self._code_hash),
+        )
+        # A bound method (not a lambda holding self) so the connection dies with the tab.
+        worker.signals.finished.connect(
+            partial(self._on_save_finished, new_query_order, default_query, snapshot, dirty_names)
+        )
+        worker.signals.error.connect(self._on_save_failed)
+        self._save_worker = worker
+        self.save_button.setEnabled(False)
+        self.refresh_button.setEnabled(False)
+        self.thread_pool.start(worker)
+
+    def _on_save_finished(self, query_order, default_query, snapshot, dirty_names, digests):
+        """Record what the save worker wrote and report success."""
+        self._save_worker = None
+        self.refresh_button.setEnabled(True)
+        self._code_hash.update(digests)
+        # Queries edited again while the files were being written stay dirty.
+        for name in dirty_names:
+            if self.queries.get(name) == snapshot.get(name):
+                self._dirty_names.discard(name)
 
-            for name in new_query_order:
-                code = self.queries.get(name, "")
-                with open(os.path.join(root_dir, f"{name}.dax"), "w", encoding="utf-8") as f:
-                    f.write(code)
+        if self.project:
+            self.project.update_dax_queries_metadata(query_order, snapshot, default_query)
+        if self._dirty_names or self.query_editor.document().isModified():
+            self.save_button.setEnabled(True)
+        QMessageBox.information(self, "Success", "Changes saved successfully!")
 
-            if self.project:
-                self.project.update_dax_queries_metadata(new_query_order, self.queries, self.default_query)
-            self.save_button.setEnabled(False)
-            QMessageBox.information(self, "Success", "Changes saved successfully!")
+    def shutdown(self):
+        """Detach a pending save; the main window calls this before discarding the tab."""
+        # The files are still written, but no result reaches the deleted widgets.
+        worker = self._save_worker
+        if worker is None:
+            return
+        self._save_worker = None
+        for signal in (worker.signals.finished, worker.signals.error):
+            try:
+                signal.disconnect()
+            except TypeError:
+                pass
 
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to save changes:\n{str(e)}")
+    def _on_save_failed(self, message: str):
+        self._save_worker = None
+        self.refresh_button.setEnabled(True)
+        self.save_button.setEnabled(True)
+        QMessageBox.critical(self, "Error", f"Failed to save changes:\n{message}")
+
+
+def _write_dax_queries(
+    root_dir: str,
+    json_path: str,
+    query_order: List[str],
+    default_query: Optional[str],
+    queries: Dict[str, str],
+    dirty_names: Set[str],
+    code_hash: Dict[str, bytes],
+) -> Dict[str, bytes]:
+    """Write daxQueries.json and the .dax files; return the digests of the files written."""
+    with open(json_path, "r", encoding="utf-8") as f:
+        current_text = f.read()
+    data = load_json_text(current_text)
+
+    data["tabOrder"] = query_order
+    data["defaultTab"] = default_query
+
+    # Serialize once; skip the write when nothing changed, otherwise swap a temp
+    # file into place so an interrupted save never leaves a torn daxQueries.json.
+    new_text = dump_json_text(data)
+    if new_text != current_text:
+        tmp_path = json_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8", buffering=_WRITE_BUFFER_SIZE) as f:
+            f.write(new_text)
+        os.replace(tmp_path, json_path)
+
+    os.makedirs(root_dir, exist_ok=True)
+
+    # Remove .dax files that no longer match a query (deleted or renamed away) and
+    # only rewrite the queries that changed or have no file yet.
+    wanted_files = {f"{name}.dax" for name in query_order}
+    existing_files = set()
+    with os.scandir(root_dir) as entries:
+        for entry in entries:
+            filename = entry.name
+            if not filename.lower().endswith(".dax") or not entry.is_file():
+                continue
+            if filename in wanted_files:
+                existing_files.add(filename)
+            else:
+                os.unlink(entry.path)
+
+    written: Dict[str, bytes] = {}
+    pending: List[Tuple[str, str]] = []
+    for name in query_order:
+        filename = f"{name}.dax"
+        if name not in dirty_names and filename in existing_files:
+            continue
+        code = queries.get(name, "")
+        digest = _code_digest(code)
+        if filename in existing_files and code_hash.get(name) == digest:
+            # Edited back to what is already on disk.
+            continue
+        pending.append((os.path.join(root_dir, filename), code))
+        written[name] = digest
+
+    if len(pending) > 1:
+        # Independent files: overlap their write latency instead of paying it in sequence.
+        with ThreadPoolExecutor(max_workers=min(_DAX_WRITE_WORKERS, len(pending))) as executor:
+            list(executor.map(lambda entry: _write_dax_file(*entry), pending))
+    elif pending:
+        _write_dax_file(*pending[0])
+    return written
+
+
+def _write_dax_file(path: str, code: str) -> None:
+    # Same temp-file swap as daxQueries.json: a failed save keeps the previous query text.
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8", buffering=_WRITE_BUFFER_SIZE) as f:
+            f.write(code)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
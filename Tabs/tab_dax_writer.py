@@ -1,21 +1,8 @@
-import html
-import json
 import re
-import threading
-import uuid
-import urllib.parse
-import urllib.request
 from typing import Dict, List, Optional, Set, Tuple
 
-from PyQt6.QtCore import Qt, QObject, QRunnable, QThreadPool, pyqtSignal
-from PyQt6.QtGui import (
-    QColor,
-    QFont,
-    QKeySequence,
-    QShortcut,
-    QSyntaxHighlighter,
-    QTextCharFormat,
-)
+from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtGui import QKeySequence, QShortcut
 from PyQt6.QtWidgets import (
     QApplication,
     QAbstractItemView,
@@ -31,201 +18,43 @@ from PyQt6.QtWidgets import (
 )
 
 from Coding.code_editor import CodeEditor
-from Coding.code_editor_support import DAXHighlighter, set_dax_model_identifiers
+from Coding.code_editor_support import set_dax_model_identifiers
 from common_functions import code_editor_font, PBIPProject, load_pbip_project
+from Tabs.tab_tables_elements import (
+    ChatGPTFreeClient,
+    ChatRequestWorker,
+    DAXTableColumnHighlighter,
+    TableColumnHighlighter,
+    _get_chat_thread_pool,
+)
 
+try:
+    import ahocorasick
+except ImportError:  # pragma: no cover - optional dependency
+    ahocorasick = None
 
-class _TableColumnHighlightMixin:
-    """Mixin providing shared formatting for table and column references."""
-
-    def _init_table_column_support(self):
-        self._table_patterns: List[re.Pattern] = []
-        self._column_patterns: List[re.Pattern] = []
-
-        self._table_format = QTextCharFormat()
-        self._table_format.setForeground(QColor("#2c7be5"))
-        self._table_format.setFontWeight(QFont.Weight.Medium)
-
-        self._column_format = QTextCharFormat()
-        self._column_format.setForeground(QColor("#00a676"))
-        self._column_format.setFontWeight(QFont.Weight.Medium)
-
-    def update_patterns(
-        self,
-        table_patterns: List[re.Pattern],
-        column_patterns: List[re.Pattern],
-    ):
-        self._table_patterns = table_patterns
-        self._column_patterns = column_patterns
-        self.rehighlight()
-
-    def _apply_table_column_highlighting(self, text: str) -> None:
-        for pattern in self._table_patterns:
-            for match in pattern.finditer(text):
-                start, end = match.span()
-                self.setFormat(start, end - start, self._table_format)
-
-        for pattern in self._column_patterns:
-            for match in pattern.finditer(text):
-                start, end = match.span()
-                self.setFormat(start, end - start, self._column_format)
-
-
-class TableColumnHighlighter(_TableColumnHighlightMixin, QSyntaxHighlighter):
-    """Custom highlighter that only colors table and column references."""
-
-    def __init__(self, document):
-        QSyntaxHighlighter.__init__(self, document)
-        self._init_table_column_support()
-
-    def highlightBlock(self, text: str) -> None:
-        self._apply_table_column_highlighting(text)
-
-
-class DAXTableColumnHighlighter(_TableColumnHighlightMixin, DAXHighlighter):
-    """DAX syntax highlighter extended with table/column coloring."""
-
-    def __init__(self, document):
-        DAXHighlighter.__init__(self, document)
-        self._init_table_column_support()
-
-    def highlightBlock(self, text: str) -> None:
-        super().highlightBlock(text)
-        self._apply_table_column_highlighting(text)
-
-
-class ChatRequestSignals(QObject):
-    finished = pyqtSignal(str)
-    error = pyqtSignal(str)
-
+_BRACKET_OPEN_RE = re.compile(r"\s*\[\s*")
+_BRACKET_CLOSE_RE = re.compile(r"\s*\]")
 
-class ChatRequestWorker(QRunnable):
-    def __init__(self, fn, *args, **kwargs):
-        super().__init__()
-        self.fn = fn
-        self.args = args
-        self.kwargs = kwargs
-        self.signals = ChatRequestSignals()
 
-    def run(self):
-        try:
-            result = self.fn(*self.args, **self.kwargs)
-        except Exception as exc:  # pragma: no cover - defensive
-            self.signals.error.emit(str(exc))
-        else:
-            self.signals.finished.emit(result)
+def _normalize_brackets(text: str) -> str:
+    """Drop the whitespace the Table[Column] patterns tolerate around brackets."""
+    return _BRACKET_CLOSE_RE.sub("]", _BRACKET_OPEN_RE.sub("[", text))
 
 
-class ChatGPTFreeClient:
-    CHAT_URL = "https://chatgptfree.ai/chat/"
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
 
-    def __init__(self):
-        self._opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor())
-        self._config: Optional[Dict] = None
-        self._session_id = str(uuid.uuid4())
-        self._conversation_id = str(uuid.uuid4())
-        self._lock = threading.Lock()
 
-    def _fetch_page_config(self) -> Dict:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
-            "Referer": self.CHAT_URL,
-        }
-        request = urllib.request.Request(self.CHAT_URL, headers=headers)
-        with self._opener.open(request, timeout=30) as resp:
-            html_text = resp.read().decode("utf-8", "ignore")
-
-        match = re.search(r"data-config='(.*?)'", html_text)
-        if not match:
-            raise RuntimeError("Unable to locate chatbot configuration on page.")
-
-        config = json.loads(html.unescape(match.group(1)))
-        required = ("ajaxUrl", "nonce", "botId")
-        if not all(key in config for key in required):
-            raise RuntimeError("Incomplete chatbot configuration received.")
-        return config
-
-    def _ensure_config(self):
-        if self._config is None:
-            self._config = self._fetch_page_config()
-
-    def _refresh_nonce(self):
-        if not self._config:
-            return
-        ajax_url = self._config.get("ajaxUrl")
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
-            "Referer": self.CHAT_URL,
-        }
-        data = {
-            "action": self._config.get("nonceRefreshAction", "aipkit_get_frontend_chat_nonce"),
-            "bot_id": str(self._config.get("botId", "")),
-        }
-        encoded = urllib.parse.urlencode(data).encode("utf-8")
-        request = urllib.request.Request(ajax_url, data=encoded, headers=headers)
-        with self._opener.open(request, timeout=30) as resp:
-            payload = json.loads(resp.read().decode("utf-8", "ignore"))
-        nonce = payload.get("data", {}).get("nonce")
-        if not nonce:
-            raise RuntimeError("Nonce refresh failed.")
-        self._config["nonce"] = nonce
-
-    def generate(self, prompt: str) -> str:
-        with self._lock:
-            self._ensure_config()
-            if not self._config:
-                raise RuntimeError("Missing chatbot configuration.")
-
-            ajax_url = self._config["ajaxUrl"]
-            headers = {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
-                "Referer": self.CHAT_URL,
-                "Content-Type": "application/x-www-form-urlencoded",
-            }
-            data = {
-                "action": "aipkit_frontend_chat_message",
-                "_ajax_nonce": self._config["nonce"],
-                "bot_id": str(self._config["botId"]),
-                "session_id": self._session_id,
-                "conversation_uuid": self._conversation_id,
-                "post_id": str(self._config.get("postId", "")),
-                "message": prompt,
-            }
-
-            encoded = urllib.parse.urlencode(data).encode("utf-8")
-            request = urllib.request.Request(ajax_url, data=encoded, headers=headers)
+_CHAT_CLIENT: Optional[ChatGPTFreeClient] = None
 
-            try:
-                response = self._opener.open(request, timeout=60)
-                payload_text = response.read().decode("utf-8", "ignore")
-            except urllib.error.HTTPError as http_err:
-                if http_err.code in (403, 401):
-                    self._refresh_nonce()
-                    data["_ajax_nonce"] = self._config["nonce"]
-                    encoded = urllib.parse.urlencode(data).encode("utf-8")
-                    request = urllib.request.Request(ajax_url, data=encoded, headers=headers)
-                    response = self._opener.open(request, timeout=60)
-                    payload_text = response.read().decode("utf-8", "ignore")
-                else:
-                    raise
-
-        payload = json.loads(payload_text)
-        if not payload.get("success"):
-            message = payload.get("data", {}).get("message") or "ChatGPT request failed."
-            raise RuntimeError(message)
-
-        reply = payload.get("data", {}).get("reply", "").strip()
-        if not reply:
-            raise RuntimeError("ChatGPT returned an empty response.")
-
-        return self._clean_reply(reply)
 
-    @staticmethod
-    def _clean_reply(text: str) -> str:
-        fence_match = re.search(r"```(?:dax)?\s*(.*?)```", text, re.IGNORECASE | re.DOTALL)
-        if fence_match:
-            return fence_match.group(1).strip()
-        return text.strip()
+def _get_chat_client() -> ChatGPTFreeClient:
+    """Return the process-wide client, so page config, nonce and cookies outlive a tab."""
+    global _CHAT_CLIENT
+    if _CHAT_CLIENT is None:
+        _CHAT_CLIENT = ChatGPTFreeClient()
+    return _CHAT_CLIENT
 
 
 class DAXWriterTab(QWidget):
@@ -236,10 +65,30 @@ class DAXWriterTab(QWidget):
         self.project = project
         self.pbip_file = str(project.pbip_path) if project else pbip_file
         self.tables_data: Dict[str, List[str]] = {}
+        # Autocomplete forms per table / (table, column); rebuilt only when the model changes.
+        self._table_forms_cache: Dict[str, List[str]] = {}
+        self._column_forms_cache: Dict[Tuple[str, str], List[str]] = {}
         self.table_patterns: List[Tuple[re.Pattern, str]] = []
-        self.column_patterns: List[Tuple[List[re.Pattern], re.Pattern, Tuple[str, str]]] = []
-        self.api_client = ChatGPTFreeClient()
-        self.thread_pool = QThreadPool.globalInstance()
+        # (Table[Column] pattern over every table form, [Column] pattern, (table, column)).
+        self.column_patterns: List[Tuple[Optional[re.Pattern], re.Pattern, Tuple[str, str]]] = []
+        # Aho-Corasick automata over the lowercased table / Table[Column] forms, so mention
+        # counting is one pass over the prompt instead of one regex search per pattern.
+        self._table_automaton = None
+        self._column_automaton = None
+        # Without ahocorasick: case-sensitive patterns over the lowercased forms, so
+        # counting searches the lowercased prompt instead of folding case per match.
+        # Each entry leads with the literal its patterns need, checked with `in` first.
+        self._table_count_patterns: List[Tuple[str, re.Pattern, str]] = []
+        self._column_count_patterns: List[Tuple[str, re.Pattern, Tuple[str, str]]] = []
+        # Automaton hits per prompt line, so a recount only rescans the lines that changed.
+        self._table_line_hits: Dict[str, Tuple[str, ...]] = {}
+        self._column_line_hits: Dict[str, Tuple[Tuple[str, str], ...]] = {}
+        # Prompt text and mentions from the last recount, reused by generate_measure.
+        self._last_scan: Optional[Tuple[str, Set[str], Set[Tuple[str, str]]]] = None
+        # Shared across tabs; its lock serializes generate calls from any of them.
+        self.api_client = _get_chat_client()
+        self.thread_pool = _get_chat_thread_pool()
+        self._worker: Optional[ChatRequestWorker] = None
 
         self.prompt_editor: Optional[CodeEditor] = None
         self.output_editor: Optional[CodeEditor] = None
@@ -252,8 +101,11 @@ class DAXWriterTab(QWidget):
         self.output_highlighter: Optional[TableColumnHighlighter] = None
         self._column_highlight_patterns: List[re.Pattern] = []
         self._selected_table: Optional[str] = None
+        self._current_tables: List[str] = []
 
         self._building_metadata = False
+        # Model metadata is turned into patterns on first use, not while the tab is built.
+        self._metadata_loaded = False
 
         self._init_ui()
         if not self.project and self.pbip_file:
@@ -262,7 +114,22 @@ class DAXWriterTab(QWidget):
                 self.pbip_file = str(self.project.pbip_path)
             except Exception:
                 self.project = None
-        if self.project:
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if not self._metadata_loaded:
+            # Let the tab paint first, then fill the table list and patterns.
+            QTimer.singleShot(0, self._ensure_metadata)
+
+    def shutdown(self):
+        """Drop this tab's chat request; call before discarding the tab."""
+        if self._worker is not None:
+            self.thread_pool.tryTake(self._worker)
+            self._worker.cancel()
+            self._worker = None
+
+    def _ensure_metadata(self):
+        if not self._metadata_loaded and self.project:
             self.load_metadata()
 
     # ----- UI -----------------------------------------------------------------
@@ -291,7 +158,12 @@ class DAXWriterTab(QWidget):
         self.prompt_editor.setPlaceholderText(
             "Example: Create a measure that sums Sales[Amount] for the selected Calendar[Year]."
         )
-        self.prompt_editor.textChanged.connect(self._on_prompt_changed)
+        # Recount mentions once typing pauses rather than on every keystroke.
+        self._mention_timer = QTimer(self)
+        self._mention_timer.setSingleShot(True)
+        self._mention_timer.setInterval(120)
+        self._mention_timer.timeout.connect(self._recompute_mentions)
+        self.prompt_editor.textChanged.connect(self._mention_timer.start)
         main_layout.addWidget(self.prompt_editor)
 
         self.count_label = QLabel("Tables mentioned: 0  Columns mentioned: 0")
@@ -353,7 +225,18 @@ class DAXWriterTab(QWidget):
         shortcut_alt = QShortcut(QKeySequence("Ctrl+Enter"), self.prompt_editor)
         shortcut_alt.activated.connect(self.generate_measure)
 
-    def _prepare_editor(self, editor: CodeEditor, *, editable: bool):
+    def _prepare_editor(self, editor: CodeEditor, *, editable: bool, force: bool = False):
+        """Install the table/column highlighter on ``editor``.
+
+        An installed highlighter of the right class on the same document is kept, so
+        preparing an editor again does not re-tokenize it; ``force`` rebuilds regardless.
+        """
+        current = self.prompt_highlighter if editable else self.output_highlighter
+        highlighter_cls = TableColumnHighlighter if editable else DAXTableColumnHighlighter
+        if not force and type(current) is highlighter_cls and current.document() is editor.document():
+            self._update_highlighters()
+            return
+
         if editable and self.prompt_highlighter:
             self.prompt_highlighter.setDocument(None)
             self.prompt_highlighter = None
@@ -369,14 +252,11 @@ class DAXWriterTab(QWidget):
                 pass
             editor._highlighter = None
 
-        if editable:
-            highlighter_cls = TableColumnHighlighter
-        else:
+        if not editable:
             try:
                 editor.set_language("dax", force=True, enable_highlighter=False)
             except Exception:
                 pass
-            highlighter_cls = DAXTableColumnHighlighter
 
         highlighter = highlighter_cls(editor.document())
         if editable:
@@ -406,8 +286,9 @@ class DAXWriterTab(QWidget):
             return
 
         self._building_metadata = True
+        self._metadata_loaded = True
         try:
-            metadata = self.project.get_power_query_metadata()
+            metadata = self.project.get_power_query_metadata(clone=False)
             if metadata.error:
                 raise RuntimeError(metadata.error)
 
@@ -415,12 +296,16 @@ class DAXWriterTab(QWidget):
                 name: list(info.get("columns") or [])
                 for name, info in metadata.tables.items()
             }
-            self.tables_data = tables
-            self._build_patterns()
-            self._update_highlighters()
+            if tables != self.tables_data:
+                self.tables_data = tables
+                self._table_forms_cache = {}
+                self._column_forms_cache = {}
+                self._build_patterns()
+                self._update_highlighters()
+                self._update_table_tree()
+            # The completion lists are module-wide and other tabs replace them; always reset.
             self._update_autocomplete()
-            self._update_table_tree()
-            self._on_prompt_changed()
+            self._recompute_mentions()
 
             table_count = len(tables)
             column_count = sum(len(cols) for cols in tables.values())
@@ -432,6 +317,13 @@ class DAXWriterTab(QWidget):
             self.tables_data = {}
             self.table_patterns = []
             self.column_patterns = []
+            self._table_automaton = None
+            self._column_automaton = None
+            self._table_line_hits = {}
+            self._column_line_hits = {}
+            self._last_scan = None
+            self._table_count_patterns = []
+            self._column_count_patterns = []
             self._update_highlighters()
             self._update_table_tree()
             if self.status_label:
@@ -444,33 +336,26 @@ class DAXWriterTab(QWidget):
         columns_terms: List[str] = []
 
         for table, columns in self.tables_data.items():
-            tables_terms.extend(self._table_autocomplete_forms(table))
+            tables_terms.extend(self._table_forms(table))
             for column in columns:
-                columns_terms.extend(self._column_autocomplete_forms(table, column))
+                columns_terms.extend(self._column_forms(table, column))
 
         set_dax_model_identifiers(tables_terms, columns_terms)
         if self.prompt_editor:
             self.prompt_editor.set_language("dax", force=True, enable_highlighter=False)
 
     def _update_highlighters(self):
-        def _deduplicate(patterns: List[re.Pattern]) -> List[re.Pattern]:
-            unique: List[re.Pattern] = []
-            seen = set()
-            for pattern in patterns:
-                key = (pattern.pattern, pattern.flags)
-                if key in seen:
-                    continue
-                seen.add(key)
-                unique.append(pattern)
-            return unique
-
-        table_regexes = _deduplicate([pattern for pattern, _ in self.table_patterns])
-        column_regexes = _deduplicate(self._column_highlight_patterns)
+        # _build_patterns already emits each highlight pattern once.
+        table_regexes = [pattern for pattern, _ in self.table_patterns]
+        column_regexes = self._column_highlight_patterns
+        # Every reference starts with a table name, a quoted table name or a [column].
+        trigger_chars = {"[", "'"}
+        trigger_chars.update(table.casefold()[:1] for _, table in self.table_patterns)
 
         if self.prompt_highlighter:
-            self.prompt_highlighter.update_patterns(table_regexes, column_regexes)
+            self.prompt_highlighter.update_patterns(table_regexes, column_regexes, trigger_chars)
         if self.output_highlighter:
-            self.output_highlighter.update_patterns(table_regexes, column_regexes)
+            self.output_highlighter.update_patterns(table_regexes, column_regexes, trigger_chars)
 
     def _update_table_tree(self):
         if not self.table_tree:
@@ -478,16 +363,31 @@ class DAXWriterTab(QWidget):
 
         previous = self._selected_table
         self.table_tree.blockSignals(True)
-        self.table_tree.clear()
 
-        tables = sorted(self.tables_data.keys(), key=str.casefold)
-        selected_item: Optional[QTreeWidgetItem] = None
+        # Reloads usually return the same tables; only add and remove the rows that changed.
+        old_tables = self._current_tables
+        tables = sorted(self.tables_data.keys(), key=self._table_sort_key)
+        inserted = False
+        old_index = new_index = 0
+        while old_index < len(old_tables) or new_index < len(tables):
+            if new_index == len(tables) or (
+                old_index < len(old_tables)
+                and self._table_sort_key(old_tables[old_index]) < self._table_sort_key(tables[new_index])
+            ):
+                self.table_tree.takeTopLevelItem(new_index)
+                old_index += 1
+            elif old_index == len(old_tables) or tables[new_index] != old_tables[old_index]:
+                self.table_tree.insertTopLevelItem(new_index, QTreeWidgetItem([tables[new_index]]))
+                new_index += 1
+                inserted = True
+            else:
+                old_index += 1
+                new_index += 1
+        self._current_tables = tables
 
-        for table in tables:
-            item = QTreeWidgetItem([table])
-            self.table_tree.addTopLevelItem(item)
-            if table == previous:
-                selected_item = item
+        selected_item: Optional[QTreeWidgetItem] = None
+        if previous in self.tables_data:
+            selected_item = self.table_tree.topLevelItem(tables.index(previous))
 
         if selected_item:
             self.table_tree.setCurrentItem(selected_item)
@@ -495,11 +395,15 @@ class DAXWriterTab(QWidget):
         else:
             self._selected_table = None
 
-        if self.table_tree.topLevelItemCount():
+        if inserted:
             self.table_tree.resizeColumnToContents(0)
 
         self.table_tree.blockSignals(False)
 
+    @staticmethod
+    def _table_sort_key(table: str) -> Tuple[str, str]:
+        return table.casefold(), table
+
     @staticmethod
     def _table_autocomplete_forms(table: str) -> List[str]:
         forms = [table]
@@ -508,12 +412,20 @@ class DAXWriterTab(QWidget):
             forms.append(f"'{escaped}'")
         return forms
 
-    @staticmethod
-    def _column_autocomplete_forms(table: str, column: str) -> List[str]:
-        escaped_col = column.replace("]", "]]")
-        forms = [f"[{escaped_col}]"]
-        for table_form in DAXWriterTab._table_autocomplete_forms(table):
-            forms.append(f"{table_form}[{escaped_col}]")
+    def _table_forms(self, table: str) -> List[str]:
+        forms = self._table_forms_cache.get(table)
+        if forms is None:
+            forms = self._table_forms_cache[table] = self._table_autocomplete_forms(table)
+        return forms
+
+    def _column_forms(self, table: str, column: str) -> List[str]:
+        key = (table, column)
+        forms = self._column_forms_cache.get(key)
+        if forms is None:
+            escaped_col = column.replace("]", "]]")
+            forms = [f"[{escaped_col}]"]
+            forms.extend(f"{table_form}[{escaped_col}]" for table_form in self._table_forms(table))
+            self._column_forms_cache[key] = forms
         return forms
 
     def _build_patterns(self):
@@ -521,42 +433,113 @@ class DAXWriterTab(QWidget):
         self.column_patterns = []
         self._column_highlight_patterns = []
 
-        for table in self.tables_data:
-            for form in self._table_autocomplete_forms(table):
-                if not form:
-                    continue
+        # Each name is escaped once; the same [Column] in several tables shares one bracket pattern.
+        escaped_table_forms: Dict[str, List[str]] = {
+            table: [re.escape(form) for form in self._table_forms(table) if form]
+            for table in self.tables_data
+        }
+        for table, escaped_forms in escaped_table_forms.items():
+            for escaped_form in escaped_forms:
                 pattern = re.compile(
-                    rf"(?<![\w\]]){re.escape(form)}(?![\w\[])",
+                    rf"(?<![\w\]]){escaped_form}(?![\w\[])",
                     re.IGNORECASE,
                 )
                 self.table_patterns.append((pattern, table))
 
+        bracket_patterns: Dict[str, re.Pattern] = {}
+        seen_highlight: Set[str] = set()
         for table, columns in self.tables_data.items():
+            # One alternation over the table's forms, so each column needs a single bound search.
+            forms_group = "|".join(escaped_table_forms[table])
+            for column in columns:
+                escaped_col = re.escape(column.replace("]", "]]"))
+                bracket_pattern = bracket_patterns.get(escaped_col)
+                if bracket_pattern is None:
+                    bracket_pattern = re.compile(rf"\[\s*{escaped_col}\s*\]", re.IGNORECASE)
+                    bracket_patterns[escaped_col] = bracket_pattern
+                bound_pattern: Optional[re.Pattern] = None
+                if forms_group:
+                    bound_pattern = re.compile(
+                        rf"(?:{forms_group})\s*\[\s*{escaped_col}\s*\]", re.IGNORECASE
+                    )
+                self.column_patterns.append((bound_pattern, bracket_pattern, (table, column)))
+                for pattern in (bound_pattern, bracket_pattern):
+                    if pattern is not None and pattern.pattern not in seen_highlight:
+                        seen_highlight.add(pattern.pattern)
+                        self._column_highlight_patterns.append(pattern)
+
+        self._build_mention_automata()
+
+    def _build_mention_automata(self):
+        self._table_automaton = None
+        self._column_automaton = None
+        self._table_line_hits = {}
+        self._column_line_hits = {}
+        self._last_scan = None
+        self._table_count_patterns = []
+        self._column_count_patterns = []
+        if ahocorasick is None:
+            self._build_count_patterns()
+            return
+
+        table_forms: Dict[str, Set[str]] = {}
+        column_forms: Dict[str, Set[Tuple[str, str]]] = {}
+        for table, columns in self.tables_data.items():
+            forms = [form for form in self._table_forms(table) if form]
+            for form in forms:
+                table_forms.setdefault(form.lower(), set()).add(table)
             for column in columns:
                 escaped_col = column.replace("]", "]]")
-                bracket_pattern = re.compile(
-                    rf"\[\s*{re.escape(escaped_col)}\s*\]", re.IGNORECASE
+                for form in forms:
+                    key = _normalize_brackets(f"{form}[{escaped_col}]".lower())
+                    column_forms.setdefault(key, set()).add((table, column))
+
+        if table_forms:
+            automaton = ahocorasick.Automaton()
+            for form, tables in table_forms.items():
+                automaton.add_word(form, (len(form), tuple(tables)))
+            automaton.make_automaton()
+            self._table_automaton = automaton
+        if column_forms:
+            automaton = ahocorasick.Automaton()
+            for form, keys in column_forms.items():
+                automaton.add_word(form, tuple(keys))
+            automaton.make_automaton()
+            self._column_automaton = automaton
+
+    def _build_count_patterns(self):
+        for table, columns in self.tables_data.items():
+            forms = [form.lower() for form in self._table_forms(table) if form]
+            for form in forms:
+                self._table_count_patterns.append(
+                    (form, re.compile(rf"(?<![\w\]]){re.escape(form)}(?![\w\[])"), table)
                 )
-                bound_patterns: List[re.Pattern] = []
-                for table_form in self._table_autocomplete_forms(table):
-                    if not table_form:
-                        continue
-                    bound_patterns.append(
-                        re.compile(
-                            rf"{re.escape(table_form)}\s*\[\s*{re.escape(escaped_col)}\s*\]",
-                            re.IGNORECASE,
-                        )
-                    )
-                self.column_patterns.append((bound_patterns, bracket_pattern, (table, column)))
-                self._column_highlight_patterns.extend(bound_patterns)
-                self._column_highlight_patterns.append(bracket_pattern)
+            if not forms:
+                continue
+            forms_group = "|".join(re.escape(form) for form in forms)
+            for column in columns:
+                column_form = column.replace("]", "]]").lower()
+                bound_pattern = re.compile(rf"(?:{forms_group})\s*\[\s*{re.escape(column_form)}\s*\]")
+                self._column_count_patterns.append((column_form, bound_pattern, (table, column)))
 
     # ----- Prompt helpers -----------------------------------------------------
-    def _on_prompt_changed(self):
+    def _recompute_mentions(self):
         if not self.prompt_editor:
             return
+        if not self._metadata_loaded:
+            # load_metadata recounts the prompt once the patterns exist.
+            self._ensure_metadata()
+            if self._metadata_loaded:
+                return
         text = self.prompt_editor.toPlainText()
-        tables_found, columns_found = self._count_mentions(text)
+        last_scan = self._last_scan
+        if last_scan is not None and last_scan[0] == text:
+            # textChanged also fires for edits that leave the text as it was (undo, reflows);
+            # the patterns reset _last_scan whenever they change.
+            _, tables_found, columns_found = last_scan
+        else:
+            tables_found, columns_found = self._count_mentions(text)
+            self._last_scan = (text, tables_found, columns_found)
         self.count_label.setText(
             f"Tables mentioned: {len(tables_found)}  Columns mentioned: {len(columns_found)}"
         )
@@ -575,17 +558,82 @@ class DAXWriterTab(QWidget):
         mentioned_tables: Set[str] = set()
         mentioned_columns: Set[Tuple[str, str]] = set()
 
-        for pattern, table in self.table_patterns:
-            if pattern.search(text):
+        if ahocorasick is not None:
+            # Names never span lines and a newline is neither a word character nor a
+            # bracket, so each line can be scanned (and cached) on its own.
+            text_lower = text.lower()
+            if self._table_automaton is not None:
+                self._table_line_hits = self._scan_lines(
+                    text_lower, self._table_line_hits, self._scan_table_line
+                )
+                for hits in self._table_line_hits.values():
+                    mentioned_tables.update(hits)
+            if self._column_automaton is not None:
+                # Brackets are normalized first: their surrounding whitespace may be a newline.
+                self._column_line_hits = self._scan_lines(
+                    _normalize_brackets(text_lower), self._column_line_hits, self._scan_column_line
+                )
+                for hits in self._column_line_hits.values():
+                    for key in hits:
+                        mentioned_columns.add(key)
+                        mentioned_tables.add(key[0])
+            return mentioned_tables, mentioned_columns
+
+        # The patterns are case-sensitive over lowercased literals, so a plain substring
+        # test rules out most of them before any regex runs.
+        text_lower = text.lower()
+        for form, pattern, table in self._table_count_patterns:
+            if table in mentioned_tables or form not in text_lower:
+                continue
+            if pattern.search(text_lower):
                 mentioned_tables.add(table)
 
-        for bound_patterns, _, (table, column) in self.column_patterns:
-            if bound_patterns and any(p.search(text) for p in bound_patterns):
+        if "[" not in text_lower:
+            return mentioned_tables, mentioned_columns
+
+        for column_form, bound_pattern, (table, column) in self._column_count_patterns:
+            if column_form not in text_lower:
+                continue
+            if bound_pattern.search(text_lower):
                 mentioned_columns.add((table, column))
                 mentioned_tables.add(table)
 
         return mentioned_tables, mentioned_columns
 
+    @staticmethod
+    def _scan_lines(text: str, previous: Dict[str, Tuple], scan) -> Dict[str, Tuple]:
+        """Return hits per distinct line, reusing ``previous`` for unchanged lines."""
+        hits: Dict[str, Tuple] = {}
+        for line in text.split("\n"):
+            if line in hits:
+                continue
+            cached = previous.get(line)
+            hits[line] = cached if cached is not None else scan(line)
+        return hits
+
+    def _scan_table_line(self, line: str) -> Tuple[str, ...]:
+        found: Set[str] = set()
+        last = len(line) - 1
+        for end, (length, tables) in self._table_automaton.iter(line):
+            # Same boundaries as the table regexes: (?<![\w\]]) ... (?![\w\[]).
+            start = end - length + 1
+            if start > 0:
+                before = line[start - 1]
+                if before == "]" or _is_word_char(before):
+                    continue
+            if end < last:
+                after = line[end + 1]
+                if after == "[" or _is_word_char(after):
+                    continue
+            found.update(tables)
+        return tuple(found)
+
+    def _scan_column_line(self, line: str) -> Tuple[Tuple[str, str], ...]:
+        found: Set[Tuple[str, str]] = set()
+        for _, keys in self._column_automaton.iter(line):
+            found.update(keys)
+        return tuple(found)
+
     # ----- Actions ------------------------------------------------------------
     def generate_measure(self):
         if not self.prompt_editor or not self.output_editor or not self.generate_button:
@@ -594,12 +642,20 @@ class DAXWriterTab(QWidget):
             QMessageBox.warning(self, "No PBIP", "Select a PBIP file to continue.")
             return
 
-        text = self.prompt_editor.toPlainText().strip()
+        raw_text = self.prompt_editor.toPlainText()
+        text = raw_text.strip()
         if not text:
             QMessageBox.information(self, "Empty Prompt", "Please describe the measure you need.")
             return
 
-        tables_found, columns_found = self._count_mentions(text)
+        self._ensure_metadata()
+        last_scan = self._last_scan
+        if last_scan is not None and last_scan[0] == raw_text:
+            # The debounced recount already scanned this exact prompt.
+            _, tables_found, columns_found = last_scan
+        else:
+            # Surrounding whitespace never changes a match, so the raw text is scanned.
+            tables_found, columns_found = self._count_mentions(raw_text)
         if not tables_found:
             QMessageBox.warning(
                 self,
@@ -628,14 +684,17 @@ class DAXWriterTab(QWidget):
         worker = ChatRequestWorker(self.api_client.generate, final_prompt)
         worker.signals.finished.connect(self._on_generation_success)
         worker.signals.error.connect(self._on_generation_error)
+        self._worker = worker
         self.thread_pool.start(worker)
 
     def _on_generation_success(self, response: str):
+        self._worker = None
         self._set_busy(False, "Generation complete.")
         if self.output_editor:
             self.output_editor.setPlainText(response)
 
     def _on_generation_error(self, message: str):
+        self._worker = None
         self._set_busy(False, f"Generation failed: {message}")
         QMessageBox.critical(
             self,
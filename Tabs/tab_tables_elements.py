@@ -1,17 +1,21 @@
 import html
+import http.cookiejar
 import json
 import os
 import re
+import tempfile
 import threading
+import time
 import urllib.error
 import urllib.parse
 import urllib.request
 import uuid
-from collections import defaultdict
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Callable, Dict, Optional, List, Tuple, Set
+from typing import Any, Callable, Deque, Dict, Optional, List, Tuple, Set, Union
 
-from PyQt6.QtCore import Qt, QObject, QRunnable, QThreadPool, pyqtSignal
+from PyQt6.QtCore import Qt, QObject, QRunnable, QStandardPaths, QThreadPool, QTimer, pyqtSignal
 from PyQt6.QtWidgets import (
     QApplication,
     QAbstractItemView,
@@ -44,17 +48,99 @@ from PyQt6.QtGui import (
     QColor,
     QSyntaxHighlighter,
     QTextCharFormat,
+    QTextCursor,
 )
 from Coding.code_editor import CodeEditor
 from Coding.code_editor_support import DAXHighlighter, set_dax_model_identifiers
 
+try:
+    import requests
+except ImportError:  # pragma: no cover - optional dependency
+    requests = None
+
+_DATA_CONFIG_RE = re.compile(rb"data-config=(['\"])(.*?)\1", re.IGNORECASE | re.DOTALL)
+_DATA_CONFIG_OPEN_RE = re.compile(rb"data-config=['\"]", re.IGNORECASE)
+# The chat page is read this many bytes at a time, and never past the limit.
+_PAGE_READ_SIZE = 4096
+_PAGE_READ_LIMIT = 512 * 1024
+_FENCE_RE = re.compile(r"```(?:dax)?\s*(.*?)```", re.IGNORECASE | re.DOTALL)
+_SIMPLE_IDENTIFIER_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+# Generated replies are inserted into the output editor this many characters at a time.
+_OUTPUT_CHUNK_SIZE = 2048
+
+
+def _chat_cache_dir() -> Optional[Path]:
+    """Per-user folder for the cached chat session, or None when Qt cannot name one."""
+    location = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.AppConfigLocation)
+    return Path(location) / "pbi_cleaner" if location else None
+
+
+def _write_private_file(path: Path, text: str) -> None:
+    """Atomically replace ``path`` with ``text`` in a file only the current user can read."""
+    path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    # mkstemp opens the file with O_EXCL and mode 0o600 before anything is written to it.
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            handle.write(text)
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+
+def _split_output_chunks(text: str, size: int = _OUTPUT_CHUNK_SIZE) -> List[str]:
+    """Split ``text`` into pieces of roughly ``size`` characters, breaking after line ends."""
+    chunks: List[str] = []
+    current: List[str] = []
+    length = 0
+    for line in text.splitlines(keepends=True):
+        current.append(line)
+        length += len(line)
+        if length >= size:
+            chunks.append("".join(current))
+            current = []
+            length = 0
+    if current:
+        chunks.append("".join(current))
+    return chunks
+
+
+def _fold_case(text: str) -> str:
+    """Casefold ``text`` so a substring test never misses an IGNORECASE regex match."""
+    # re.IGNORECASE also equates the dotless i with I/i; casefold keeps it distinct.
+    return text.casefold().replace("\u0131", "i")
+
+
+def _combine_highlight_patterns(
+    table_patterns: List[re.Pattern],
+    column_patterns: List[re.Pattern],
+) -> Optional[re.Pattern]:
+    """Build one regex whose ``column``/``table`` group tells the highlighter the format."""
+    # Column alternatives are tried first, matching the old paint order (columns over tables).
+    parts: List[str] = []
+    flags = 0
+    for group, patterns in (("column", column_patterns), ("table", table_patterns)):
+        if not patterns:
+            continue
+        flags = patterns[0].flags
+        sources = sorted({pattern.pattern for pattern in patterns}, key=len, reverse=True)
+        parts.append(f"(?P<{group}>" + "|".join(f"(?:{source})" for source in sources) + ")")
+    if not parts:
+        return None
+    return re.compile("|".join(parts), flags)
+
 
 class _TableColumnHighlightMixin:
     """Shared highlight logic for table and column references."""
 
     def _init_table_column_support(self) -> None:
-        self._table_patterns: List[re.Pattern] = []
-        self._column_patterns: List[re.Pattern] = []
+        self._combined_re: Optional[re.Pattern] = None
+        self._trigger_chars: Optional[Set[str]] = None
+        self._rehighlight_pending = False
 
         self._table_format = QTextCharFormat()
         self._table_format.setForeground(QColor("#2c7be5"))
@@ -68,21 +154,37 @@ class _TableColumnHighlightMixin:
         self,
         table_patterns: List[re.Pattern],
         column_patterns: List[re.Pattern],
+        trigger_chars: Optional[Set[str]] = None,
     ) -> None:
-        self._table_patterns = table_patterns
-        self._column_patterns = column_patterns
+        """Swap in new patterns; ``trigger_chars`` are the casefolded characters a match can start with."""
+        combined = _combine_highlight_patterns(table_patterns, column_patterns)
+        self._trigger_chars = trigger_chars
+        if combined == self._combined_re:
+            return
+        self._combined_re = combined
+        # Pattern updates arrive in bursts (editor setup, metadata reload); repaint once.
+        if not self._rehighlight_pending:
+            self._rehighlight_pending = True
+            QTimer.singleShot(0, self._run_pending_rehighlight)
+
+    def _run_pending_rehighlight(self) -> None:
+        self._rehighlight_pending = False
         self.rehighlight()
 
     def _apply_table_column_highlighting(self, text: str) -> None:
-        for pattern in self._table_patterns:
-            for match in pattern.finditer(text):
-                start, end = match.span()
-                self.setFormat(start, end - start, self._table_format)
-
-        for pattern in self._column_patterns:
-            for match in pattern.finditer(text):
-                start, end = match.span()
-                self.setFormat(start, end - start, self._column_format)
+        combined = self._combined_re
+        if combined is None:
+            return
+        # Most lines of a prompt mention nothing; skip the regex when no reference can start here.
+        trigger_chars = self._trigger_chars
+        if trigger_chars is not None and trigger_chars.isdisjoint(text.casefold()):
+            return
+        table_format = self._table_format
+        column_format = self._column_format
+        for match in combined.finditer(text):
+            start = match.start()
+            fmt = column_format if match.lastgroup == "column" else table_format
+            self.setFormat(start, match.end() - start, fmt)
 
 
 class TableColumnHighlighter(_TableColumnHighlightMixin, QSyntaxHighlighter):
@@ -120,14 +222,39 @@ class ChatRequestWorker(QRunnable):
         self.args = args
         self.kwargs = kwargs
         self.signals = ChatRequestSignals()
+        # Set from the GUI thread when the owning tab goes away; results are then dropped.
+        self._cancel = threading.Event()
+
+    def cancel(self) -> None:
+        self._cancel.set()
 
     def run(self) -> None:  # pragma: no cover - background thread
         try:
             result = self.fn(*self.args, **self.kwargs)
         except Exception as exc:  # pragma: no cover - defensive
-            self.signals.error.emit(str(exc))
+            if not self._cancel.is_set():
+                self.signals.error.emit(str(exc))
         else:
-            self.signals.finished.emit(result)
+            if not self._cancel.is_set():
+                self.signals.finished.emit(result)
+
+
+_CHAT_THREAD_POOL: Optional[QThreadPool] = None
+
+
+def _get_chat_thread_pool() -> QThreadPool:
+    """Return the process-wide chat pool.
+
+    Chat calls are serialized by the client lock anyway; one private thread keeps a slow
+    request from holding a global-pool thread other background work needs. The pool has no
+    parent, so deleting a tab never waits in ~QThreadPool for a request still on the wire.
+    """
+    global _CHAT_THREAD_POOL
+    if _CHAT_THREAD_POOL is None:
+        _CHAT_THREAD_POOL = QThreadPool()
+        _CHAT_THREAD_POOL.setMaxThreadCount(1)
+        _CHAT_THREAD_POOL.setExpiryTimeout(30000)
+    return _CHAT_THREAD_POOL
 
 
 class ChatGPTFreeClient:
@@ -136,13 +263,66 @@ class ChatGPTFreeClient:
     CHAT_URL = "https://chatgptfree.ai/chat/"
     USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36"
     REQUIRED_KEYS = ("ajaxUrl", "nonce", "botId")
+    # Scraped config and cookies are reused across app starts for this long.
+    SESSION_CACHE_TTL = 30 * 60
 
     def __init__(self) -> None:
-        self._opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor())
+        cache_dir = _chat_cache_dir()
+        self._config_cache_path = cache_dir / "chatgptfree.json" if cache_dir else None
+        self._cookie_jar = http.cookiejar.LWPCookieJar(str(cache_dir / "chatgptfree.cookies") if cache_dir else None)
+        # A requests session keeps the TLS connection alive and accepts gzip bodies;
+        # urllib opens a new connection per request and is only the fallback.
+        if requests is not None:
+            self._session = requests.Session()
+            self._session.cookies = self._cookie_jar
+            self._session.headers["User-Agent"] = self.USER_AGENT
+            self._opener = None
+        else:
+            self._session = None
+            self._opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(self._cookie_jar))
         self._config: Optional[Dict[str, Any]] = None
+        # URL-encoded message fields that only change with the nonce or session.
+        self._static_form: Optional[bytes] = None
         self._session_id = self._new_uuid()
         self._conversation_id = self._new_uuid()
         self._lock = threading.Lock()
+        self._load_cached_session()
+
+    def _load_cached_session(self) -> None:
+        """Reuse a recently scraped config and its cookies instead of fetching the page again."""
+        if self._config_cache_path is None:
+            return
+        try:
+            age = time.time() - self._config_cache_path.stat().st_mtime
+            if age > self.SESSION_CACHE_TTL:
+                return
+            config = load_json_text(self._config_cache_path.read_text(encoding="utf-8"))
+            if not isinstance(config, dict) or any(key not in config for key in self.REQUIRED_KEYS):
+                return
+            if os.path.exists(self._cookie_jar.filename):
+                self._cookie_jar.load(ignore_discard=True)
+        except (OSError, ValueError, http.cookiejar.LoadError):
+            return
+        self._config = config
+
+    def _save_cached_session(self) -> None:
+        if not self._config or self._config_cache_path is None:
+            return
+        # The nonce and session cookies are credentials; neither file is readable by other users.
+        cookies = "#LWP-Cookies-2.0\n" + self._cookie_jar.as_lwp_str(ignore_discard=True, ignore_expires=False)
+        try:
+            _write_private_file(self._config_cache_path, json.dumps(self._config))
+            _write_private_file(Path(self._cookie_jar.filename), cookies)
+        except OSError:
+            pass
+
+    def _drop_cached_session(self) -> None:
+        if self._config_cache_path is None:
+            return
+        try:
+            self._config_cache_path.unlink()
+        except OSError:
+            pass
 
     @staticmethod
     def _new_uuid() -> str:
@@ -151,9 +331,41 @@ class ChatGPTFreeClient:
     def _reset_session(self) -> None:
         """Start a fresh anonymous session and drop cached configuration."""
         self._config = None
+        self._static_form = None
+        self._drop_cached_session()
         self._session_id = self._new_uuid()
         self._conversation_id = self._new_uuid()
 
+    def _send(
+        self,
+        url: str,
+        headers: Dict[str, str],
+        data: Optional[Union[Dict[str, str], bytes]] = None,
+        timeout: int = 30,
+    ) -> Tuple[int, bytes]:
+        """GET ``url`` (or POST ``data``, a form dict or encoded body) and return the status code and body."""
+        if self._session is not None:
+            if data is None:
+                response = self._session.get(url, headers=headers, timeout=timeout)
+            else:
+                response = self._session.post(url, data=data, headers=headers, timeout=timeout)
+            return response.status_code, response.content
+
+        encoded = data
+        if isinstance(data, dict):
+            encoded = urllib.parse.urlencode(data).encode("utf-8")
+        request = urllib.request.Request(url, data=encoded, headers=headers)
+        try:
+            with self._opener.open(request, timeout=timeout) as response:
+                return response.status, response.read()
+        except urllib.error.HTTPError as http_err:
+            return http_err.code, http_err.read()
+
+    @staticmethod
+    def _check_status(status: int, body: bytes) -> None:
+        if status >= 400:
+            raise RuntimeError(f"HTTP Error {status}: {body[:200].decode('utf-8', 'ignore')}")
+
     def _fetch_page_config(self) -> Dict[str, Any]:
         headers = {
             "User-Agent": self.USER_AGENT,
@@ -161,18 +373,14 @@ class ChatGPTFreeClient:
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
             "Accept-Language": "en-US,en;q=0.9",
         }
-        request = urllib.request.Request(self.CHAT_URL, headers=headers)
-        with self._opener.open(request, timeout=30) as response:
-            html_text = response.read().decode("utf-8", "ignore")
-
-        match = re.search(r"data-config=(['\"])(.*?)\1", html_text, re.IGNORECASE | re.DOTALL)
+        match = self._stream_page_config(headers)
         if not match:
             raise RuntimeError("Unable to locate chatbot configuration on page.")
 
-        payload = html.unescape(match.group(2))
+        payload = html.unescape(match.group(2).decode("utf-8", "ignore"))
         try:
-            config = json.loads(payload)
-        except json.JSONDecodeError as exc:
+            config = load_json_text(payload)
+        except ValueError as exc:
             raise RuntimeError("Unable to parse chatbot configuration payload.") from exc
 
         missing = [key for key in self.REQUIRED_KEYS if key not in config]
@@ -181,12 +389,54 @@ class ChatGPTFreeClient:
 
         return config
 
+    def _stream_page_config(self, headers: Dict[str, str], timeout: int = 30) -> Optional["re.Match[bytes]"]:
+        """GET the chat page and stop reading as soon as its ``data-config`` attribute is complete."""
+        if self._session is not None:
+            with self._session.get(self.CHAT_URL, headers=headers, timeout=timeout, stream=True) as response:
+                if response.status_code >= 400:
+                    self._check_status(response.status_code, response.raw.read(200, decode_content=True))
+                return self._scan_page_config(
+                    lambda: response.raw.read(_PAGE_READ_SIZE, decode_content=True)
+                )
+
+        request = urllib.request.Request(self.CHAT_URL, headers=headers)
+        try:
+            response = self._opener.open(request, timeout=timeout)
+        except urllib.error.HTTPError as http_err:
+            self._check_status(http_err.code, http_err.read(200))
+            raise
+        with response:
+            return self._scan_page_config(lambda: response.read(_PAGE_READ_SIZE))
+
+    @staticmethod
+    def _scan_page_config(read: Callable[[], bytes]) -> Optional["re.Match[bytes]"]:
+        buffer = bytearray()
+        scan_from = 0
+        while len(buffer) < _PAGE_READ_LIMIT:
+            chunk = read()
+            if not chunk:
+                break
+            buffer += chunk
+            match = _DATA_CONFIG_RE.search(buffer, scan_from)
+            if match:
+                return match
+            # Resume at an attribute still waiting for its closing quote, or near the end.
+            opening = _DATA_CONFIG_OPEN_RE.search(buffer, scan_from)
+            scan_from = opening.start() if opening else max(0, len(buffer) - len(b"data-config='"))
+        return None
+
     def _ensure_config(self) -> None:
         if self._config is None:
             self._config = self._fetch_page_config()
+            self._save_cached_session()
 
     def _refresh_nonce(self) -> None:
         """Refresh nonce token used by the AJAX endpoint."""
+        self._static_form = None
+        self._renew_nonce()
+        self._save_cached_session()
+
+    def _renew_nonce(self) -> None:
         if not self._config:
             self._config = self._fetch_page_config()
             return
@@ -205,11 +455,10 @@ class ChatGPTFreeClient:
             "Referer": self.CHAT_URL,
             "Content-Type": "application/x-www-form-urlencoded",
         }
-        encoded = urllib.parse.urlencode(data).encode("utf-8")
-        request = urllib.request.Request(ajax_url, data=encoded, headers=headers)
         try:
-            with self._opener.open(request, timeout=30) as response:
-                payload = json.loads(response.read().decode("utf-8", "ignore"))
+            status, body = self._send(ajax_url, headers, data)
+            self._check_status(status, body)
+            payload = load_json_text(body.decode("utf-8", "ignore"))
         except Exception:
             # If refreshing fails, fetch a brand-new configuration.
             self._config = self._fetch_page_config()
@@ -221,7 +470,7 @@ class ChatGPTFreeClient:
             return
         self._config["nonce"] = nonce
 
-    def _build_request_parts(self, prompt: str) -> Tuple[str, Dict[str, str], Dict[str, str]]:
+    def _build_request_parts(self, prompt: str) -> Tuple[str, Dict[str, str], bytes]:
         if not self._config:
             raise RuntimeError("Chat service configuration unavailable.")
         ajax_url = self._config.get("ajaxUrl")
@@ -236,38 +485,33 @@ class ChatGPTFreeClient:
             "Referer": self.CHAT_URL,
             "Content-Type": "application/x-www-form-urlencoded",
         }
-        data = {
-            "action": self._config.get("messageAction", "aipkit_frontend_chat_message"),
-            "_ajax_nonce": nonce,
-            "bot_id": str(self._config.get("botId")),
-            "session_id": self._session_id,
-            "conversation_uuid": self._conversation_id,
-            "post_id": str(self._config.get("postId", "")),
-            "message": prompt,
-        }
+        if self._static_form is None:
+            self._static_form = urllib.parse.urlencode(
+                {
+                    "action": self._config.get("messageAction", "aipkit_frontend_chat_message"),
+                    "_ajax_nonce": nonce,
+                    "bot_id": str(self._config.get("botId")),
+                    "session_id": self._session_id,
+                    "conversation_uuid": self._conversation_id,
+                    "post_id": str(self._config.get("postId", "")),
+                }
+            ).encode("utf-8")
+        data = self._static_form + b"&message=" + urllib.parse.quote_plus(prompt).encode("utf-8")
         return ajax_url, headers, data
 
     def _post_message(self, prompt: str) -> str:
         ajax_url, headers, data = self._build_request_parts(prompt)
-        encoded = urllib.parse.urlencode(data).encode("utf-8")
-        request = urllib.request.Request(ajax_url, data=encoded, headers=headers)
-
-        try:
-            with self._opener.open(request, timeout=60) as response:
-                return response.read().decode("utf-8", "ignore")
-        except urllib.error.HTTPError as http_err:
-            if http_err.code in (401, 403):
-                self._refresh_nonce()
-                ajax_url, headers, data = self._build_request_parts(prompt)
-                encoded = urllib.parse.urlencode(data).encode("utf-8")
-                request = urllib.request.Request(ajax_url, data=encoded, headers=headers)
-                with self._opener.open(request, timeout=60) as response:
-                    return response.read().decode("utf-8", "ignore")
-            raise
+        status, body = self._send(ajax_url, headers, data, timeout=60)
+        if status in (401, 403):
+            self._refresh_nonce()
+            ajax_url, headers, data = self._build_request_parts(prompt)
+            status, body = self._send(ajax_url, headers, data, timeout=60)
+        self._check_status(status, body)
+        return body.decode("utf-8", "ignore")
 
     @staticmethod
     def _clean_reply(text: str) -> str:
-        fence_match = re.search(r"```(?:dax)?\s*(.*?)```", text, re.IGNORECASE | re.DOTALL)
+        fence_match = _FENCE_RE.search(text)
         if fence_match:
             return fence_match.group(1).strip()
         return text.strip()
@@ -280,7 +524,7 @@ class ChatGPTFreeClient:
                 try:
                     self._ensure_config()
                     payload_text = self._post_message(prompt)
-                    payload = json.loads(payload_text)
+                    payload = load_json_text(payload_text)
                 except Exception as exc:
                     last_error = exc
                     self._reset_session()
@@ -303,7 +547,30 @@ class ChatGPTFreeClient:
             if last_error:
                 raise RuntimeError(str(last_error))
             raise RuntimeError("Unable to reach ChatGPT service.")
-from common_functions import code_editor_font, APP_THEME, PBIPProject, load_pbip_project, _parse_table_measures
+from common_functions import (
+    code_editor_font,
+    APP_THEME,
+    PBIPProject,
+    load_json_text,
+    load_pbip_project,
+    _parse_table_measures,
+    _table_code_text,
+    _table_tmdl_text,
+)
+
+_TMDL_READ_WORKERS = 8
+
+
+def _read_tmdl_text(file_path: Path) -> Optional[str]:
+    try:
+        return file_path.read_text(encoding="utf-8")
+    except UnicodeDecodeError:
+        try:
+            return file_path.read_text(encoding="utf-8-sig")
+        except Exception:
+            return None
+    except OSError:
+        return None
 
 
 class HierarchyTree(QTreeWidget):
@@ -471,6 +738,7 @@ class PowerQueryTab(QWidget):
     ITEM_MEASURE_FOLDER = "measure_folder"
     ITEM_MEASURE = "measure"
     OTHER_QUERIES_NAME = "Other Queries"
+    DAX_MENTIONS_CACHE_SIZE = 8
     ALLOWED_CHILDREN: Dict[str, Set[str]] = {
         ITEM_FOLDER: frozenset({ITEM_FOLDER, ITEM_TABLE}),
         ITEM_TABLE: frozenset({ITEM_COLUMN, ITEM_MEASURE_FOLDER, ITEM_MEASURE}),
@@ -514,12 +782,26 @@ class PowerQueryTab(QWidget):
         self.dax_prompt_highlighter: Optional[TableColumnHighlighter] = None
         self.dax_output_highlighter: Optional[DAXTableColumnHighlighter] = None
         self.dax_table_patterns: List[Tuple[re.Pattern, str]] = []
-        self.dax_column_patterns: List[Tuple[List[re.Pattern], re.Pattern, Tuple[str, str]]] = []
+        # (Table[Column] pattern over every table form, [Column] pattern, (table, column)).
+        self.dax_column_patterns: List[Tuple[Optional[re.Pattern], re.Pattern, Tuple[str, str]]] = []
+        # Casefolded literal each pattern above needs, checked with `in` before the regex runs.
+        self._dax_table_needles: List[str] = []
+        self._dax_column_needles: List[str] = []
         self._dax_column_highlight_patterns: List[re.Pattern] = []
         self._column_table_counts: Dict[str, int] = {}
-        self.dax_thread_pool = QThreadPool.globalInstance()
+        # Mentions for recently scanned prompt texts; cleared whenever the patterns change.
+        self._dax_mentions_cache: Dict[str, Tuple[Set[str], Set[Tuple[str, str]]]] = {}
+        self.dax_thread_pool = _get_chat_thread_pool()
         self.dax_api_client = ChatGPTFreeClient()
+        self._dax_worker: Optional[ChatRequestWorker] = None
         self._dax_busy = False
+        # Reply chunks still waiting to be inserted into the DAX output editor. The timer is
+        # owned by the tab, so no pending insert can outlive it.
+        self._dax_output_chunks: Deque[str] = deque()
+        self._dax_output_cursor: Optional[QTextCursor] = None
+        self._dax_output_timer = QTimer(self)
+        self._dax_output_timer.setInterval(0)
+        self._dax_output_timer.timeout.connect(self._pump_dax_output)
         self._dax_prompt_shortcuts: List[QShortcut] = []
         self.is_dirty = False
         self.save_button: Optional[QPushButton] = None
@@ -713,7 +995,12 @@ class PowerQueryTab(QWidget):
         self.dax_prompt_editor.setPlaceholderText(
             "Example: Create a measure that sums Sales[Amount] for the selected Calendar[Year]."
         )
-        self.dax_prompt_editor.textChanged.connect(self._on_dax_prompt_changed)
+        # Recount mentions once typing pauses rather than on every keystroke.
+        self._dax_recount_timer = QTimer(self)
+        self._dax_recount_timer.setSingleShot(True)
+        self._dax_recount_timer.setInterval(150)
+        self._dax_recount_timer.timeout.connect(self._on_dax_prompt_changed)
+        self.dax_prompt_editor.textChanged.connect(self._dax_recount_timer.start)
         dax_writer_layout.addWidget(self.dax_prompt_editor)
 
         self.dax_count_label = QLabel("Tables mentioned: 0  Columns mentioned: 0")
@@ -841,7 +1128,7 @@ class PowerQueryTab(QWidget):
         if not name:
             return []
         identifiers = [name]
-        if not re.match(r"^[A-Za-z_][A-Za-z0-9_]*$", name):
+        if not _SIMPLE_IDENTIFIER_RE.match(name):
             escaped = name.replace("'", "''")
             identifiers.append(f"'{escaped}'")
         return identifiers
@@ -911,24 +1198,36 @@ class PowerQueryTab(QWidget):
             base = Path(str(root))
         if not base.exists():
             return texts
-        iterator = base.rglob("*.tmdl") if recursive else base.glob("*.tmdl")
-        for file_path in iterator:
-            if not file_path.is_file():
-                continue
+        paths = list(self._iter_tmdl_files(base, recursive=recursive))
+        if len(paths) > 1:
+            # Page and table files are independent; overlap the reads, keep the walk order.
+            with ThreadPoolExecutor(max_workers=min(_TMDL_READ_WORKERS, len(paths))) as executor:
+                contents = list(executor.map(_read_tmdl_text, paths))
+        else:
+            contents = [_read_tmdl_text(path) for path in paths]
+        texts.extend(text for text in contents if text is not None)
+        return texts
+
+    @staticmethod
+    def _iter_tmdl_files(base: Path, *, recursive: bool):
+        # scandir entries carry the file type, so there is no extra stat per file.
+        pending = [base]
+        while pending:
+            folder = pending.pop()
             try:
-                texts.append(file_path.read_text(encoding="utf-8"))
-            except UnicodeDecodeError:
-                try:
-                    texts.append(file_path.read_text(encoding="utf-8-sig"))
-                except Exception:
-                    continue
+                with os.scandir(folder) as entries:
+                    for entry in entries:
+                        if entry.is_dir():
+                            if recursive:
+                                pending.append(Path(entry.path))
+                        elif entry.name.lower().endswith(".tmdl") and entry.is_file():
+                            yield Path(entry.path)
             except OSError:
                 continue
-        return texts
 
     @staticmethod
     def _is_simple_identifier(name: str) -> bool:
-        return bool(name) and bool(re.match(r"^[A-Za-z_][A-Za-z0-9_]*$", name))
+        return bool(name) and bool(_SIMPLE_IDENTIFIER_RE.match(name))
 
     @staticmethod
     def _quote_identifier(name: str) -> str:
@@ -994,17 +1293,17 @@ class PowerQueryTab(QWidget):
         if root is None:
             return
 
+        if not self.tables_data:
+            return
+
         definition_dir = root / "definition"
-        tables_dir = definition_dir / "tables"
         pages_dir = definition_dir / "pages"
 
-        table_texts = self._gather_tmdl_texts(tables_dir, recursive=False)
+        # Table sources kept from parsing are reused; the rest (and the pages) come from disk.
+        table_texts = [text for text in map(_table_tmdl_text, self.tables_data.values()) if text]
         pages_texts = self._gather_tmdl_texts(pages_dir, recursive=True)
         combined_texts = table_texts + pages_texts
 
-        if not self.tables_data:
-            return
-
         for table_name, data in self.tables_data.items():
             table_pattern = self._build_table_reference_pattern(table_name)
             if table_pattern is not None and combined_texts:
@@ -1045,7 +1344,20 @@ class PowerQueryTab(QWidget):
         *,
         editable: bool,
         for_output: bool,
+        force: bool = False,
     ) -> None:
+        """Install the table/column highlighter on a DAX writer editor.
+
+        An installed highlighter of the right class on the same document is kept, so
+        preparing an editor again does not re-tokenize it; ``force`` rebuilds regardless.
+        """
+        current = self.dax_output_highlighter if for_output else self.dax_prompt_highlighter
+        highlighter_cls = DAXTableColumnHighlighter if for_output else TableColumnHighlighter
+        if not force and type(current) is highlighter_cls and current.document() is editor.document():
+            editor.setReadOnly(not editable)
+            self._update_dax_writer_highlighters()
+            return
+
         if for_output and self.dax_output_highlighter:
             self.dax_output_highlighter.setDocument(None)
             self.dax_output_highlighter = None
@@ -1079,31 +1391,24 @@ class PowerQueryTab(QWidget):
         editor.setReadOnly(not editable)
 
         if for_output:
-            self.dax_output_highlighter = DAXTableColumnHighlighter(editor.document())
+            self.dax_output_highlighter = highlighter_cls(editor.document())
         else:
-            self.dax_prompt_highlighter = TableColumnHighlighter(editor.document())
+            self.dax_prompt_highlighter = highlighter_cls(editor.document())
 
         self._update_dax_writer_highlighters()
 
     def _update_dax_writer_highlighters(self) -> None:
-        def _deduplicate(patterns: List[re.Pattern]) -> List[re.Pattern]:
-            unique: List[re.Pattern] = []
-            seen: Set[Tuple[str, int]] = set()
-            for pattern in patterns:
-                key = (pattern.pattern, pattern.flags)
-                if key in seen:
-                    continue
-                seen.add(key)
-                unique.append(pattern)
-            return unique
-
-        table_regexes = _deduplicate([pattern for pattern, _ in self.dax_table_patterns])
-        column_regexes = _deduplicate(self._dax_column_highlight_patterns)
+        # _refresh_dax_writer_metadata already emits each highlight pattern once.
+        table_regexes = [pattern for pattern, _ in self.dax_table_patterns]
+        column_regexes = self._dax_column_highlight_patterns
+        # Every reference starts with a table name, a quoted table name or a [column].
+        trigger_chars = {"[", "'"}
+        trigger_chars.update(table.casefold()[:1] for _, table in self.dax_table_patterns)
 
         if self.dax_prompt_highlighter:
-            self.dax_prompt_highlighter.update_patterns(table_regexes, column_regexes)
+            self.dax_prompt_highlighter.update_patterns(table_regexes, column_regexes, trigger_chars)
         if self.dax_output_highlighter:
-            self.dax_output_highlighter.update_patterns(table_regexes, column_regexes)
+            self.dax_output_highlighter.update_patterns(table_regexes, column_regexes, trigger_chars)
 
     def _refresh_dax_writer_metadata(self) -> None:
         tables: Dict[str, List[str]] = {}
@@ -1120,7 +1425,10 @@ class PowerQueryTab(QWidget):
 
         self.dax_table_patterns = []
         self.dax_column_patterns = []
+        self._dax_table_needles = []
+        self._dax_column_needles = []
         self._dax_column_highlight_patterns = []
+        self._dax_mentions_cache = {}
 
         if not tables:
             self._column_table_counts = {}
@@ -1128,33 +1436,40 @@ class PowerQueryTab(QWidget):
             self._on_dax_prompt_changed()
             return
 
-        for table in tables:
-            for form in self._table_autocomplete_forms(table):
-                if not form:
-                    continue
-                pattern = re.compile(rf"(?<![\w\]]){re.escape(form)}(?![\w\[])", re.IGNORECASE)
+        # Each name is escaped once; the same [Column] in several tables shares one bracket pattern.
+        table_forms: Dict[str, List[Tuple[str, str]]] = {
+            table: [(form, re.escape(form)) for form in self._table_autocomplete_forms(table) if form]
+            for table in tables
+        }
+        for table, forms in table_forms.items():
+            for form, escaped_form in forms:
+                pattern = re.compile(rf"(?<![\w\]]){escaped_form}(?![\w\[])", re.IGNORECASE)
                 self.dax_table_patterns.append((pattern, table))
+                self._dax_table_needles.append(_fold_case(form))
 
+        bracket_patterns: Dict[str, re.Pattern] = {}
+        seen_highlight: Set[str] = set()
         for table, columns in tables.items():
+            # One alternation over the table's forms, so each column needs a single bound search.
+            forms_group = "|".join(escaped_form for _, escaped_form in table_forms[table])
             for column in columns:
-                escaped_col = column.replace("]", "]]")
-                bracket_pattern = re.compile(
-                    rf"\[\s*{re.escape(escaped_col)}\s*\]",
-                    re.IGNORECASE,
-                )
-                bound_patterns: List[re.Pattern] = []
-                for table_form in self._table_autocomplete_forms(table):
-                    if not table_form:
-                        continue
-                    bound_patterns.append(
-                        re.compile(
-                            rf"{re.escape(table_form)}\s*\[\s*{re.escape(escaped_col)}\s*\]",
-                            re.IGNORECASE,
-                        )
+                column_form = column.replace("]", "]]")
+                escaped_col = re.escape(column_form)
+                bracket_pattern = bracket_patterns.get(escaped_col)
+                if bracket_pattern is None:
+                    bracket_pattern = re.compile(rf"\[\s*{escaped_col}\s*\]", re.IGNORECASE)
+                    bracket_patterns[escaped_col] = bracket_pattern
+                bound_pattern: Optional[re.Pattern] = None
+                if forms_group:
+                    bound_pattern = re.compile(
+                        rf"(?:{forms_group})\s*\[\s*{escaped_col}\s*\]", re.IGNORECASE
                     )
-                self.dax_column_patterns.append((bound_patterns, bracket_pattern, (table, column)))
-                self._dax_column_highlight_patterns.extend(bound_patterns)
-                self._dax_column_highlight_patterns.append(bracket_pattern)
+                self.dax_column_patterns.append((bound_pattern, bracket_pattern, (table, column)))
+                self._dax_column_needles.append(_fold_case(column_form))
+                for pattern in (bound_pattern, bracket_pattern):
+                    if pattern is not None and pattern.pattern not in seen_highlight:
+                        seen_highlight.add(pattern.pattern)
+                        self._dax_column_highlight_patterns.append(pattern)
 
         self._update_dax_writer_highlighters()
         self._on_dax_prompt_changed()
@@ -1179,16 +1494,39 @@ class PowerQueryTab(QWidget):
         )
 
     def _count_dax_mentions(self, text: str) -> Tuple[Set[str], Set[Tuple[str, str]]]:
+        cache = self._dax_mentions_cache
+        cached = cache.pop(text, None)
+        if cached is None:
+            cached = self._scan_dax_mentions(text)
+            if len(cache) >= self.DAX_MENTIONS_CACHE_SIZE:
+                del cache[next(iter(cache))]
+        # Re-inserted so the dict order doubles as least-recently-used order.
+        cache[text] = cached
+        return set(cached[0]), set(cached[1])
+
+    def _scan_dax_mentions(self, text: str) -> Tuple[Set[str], Set[Tuple[str, str]]]:
         mentioned_tables: Set[str] = set()
         mentioned_columns: Set[Tuple[str, str]] = set()
 
-        for pattern, table in self.dax_table_patterns:
+        # Most names are not in a short prompt at all; a substring test rules them out
+        # far cheaper than the boundary-checking regex.
+        folded = _fold_case(text)
+        for (pattern, table), needle in zip(self.dax_table_patterns, self._dax_table_needles):
+            if table in mentioned_tables or needle not in folded:
+                continue
             if pattern.search(text):
                 mentioned_tables.add(table)
 
-        for bound_patterns, bracket_pattern, (table, column) in self.dax_column_patterns:
+        if "[" not in text:
+            return mentioned_tables, mentioned_columns
+
+        for (bound_pattern, bracket_pattern, (table, column)), needle in zip(
+            self.dax_column_patterns, self._dax_column_needles
+        ):
+            if needle not in folded:
+                continue
             column_key = column.casefold()
-            matched = any(p.search(text) for p in bound_patterns)
+            matched = bound_pattern is not None and bool(bound_pattern.search(text))
             if not matched and self._column_table_counts.get(column_key, 0) == 1:
                 matched = bool(bracket_pattern.search(text))
             if matched:
@@ -1206,7 +1544,8 @@ class PowerQueryTab(QWidget):
             QMessageBox.warning(self, "No PBIP", "Select a PBIP file to continue.")
             return
 
-        text = self.dax_prompt_editor.toPlainText().strip()
+        raw_text = self.dax_prompt_editor.toPlainText()
+        text = raw_text.strip()
         if not text:
             QMessageBox.information(self, "Empty Prompt", "Please describe the measure you need.")
             return
@@ -1214,7 +1553,9 @@ class PowerQueryTab(QWidget):
         if not self.dax_table_patterns:
             self._refresh_dax_writer_metadata()
 
-        tables_found, columns_found = self._count_dax_mentions(text)
+        # Same text the prompt-change handler counted, so this is normally a cache hit;
+        # surrounding whitespace never changes a match.
+        tables_found, columns_found = self._count_dax_mentions(raw_text)
         if not tables_found:
             QMessageBox.warning(
                 self,
@@ -1243,14 +1584,54 @@ class PowerQueryTab(QWidget):
         worker = ChatRequestWorker(self.dax_api_client.generate, final_prompt)
         worker.signals.finished.connect(self._on_dax_generation_success)
         worker.signals.error.connect(self._on_dax_generation_error)
+        self._dax_worker = worker
         self.dax_thread_pool.start(worker)
 
     def _on_dax_generation_success(self, response: str) -> None:
+        self._dax_worker = None
+        # Long replies go in one chunk per event-loop pass so the highlighter never blocks
+        # the UI for the whole text; the writer stays busy until the last chunk is in.
+        self._dax_output_chunks = deque(_split_output_chunks(response))
+        if not self.dax_output_editor:
+            self._finish_dax_output()
+            return
+        # Clear even for an empty reply so the previous measure never stays on screen.
+        self.dax_output_editor.clear()
+        if not self._dax_output_chunks:
+            self._finish_dax_output()
+            return
+        # A private cursor appends the chunks, all in one undo step, without moving the
+        # editor's own cursor or scroll position.
+        cursor = QTextCursor(self.dax_output_editor.document())
+        cursor.beginEditBlock()
+        cursor.insertText(self._dax_output_chunks.popleft())
+        cursor.endEditBlock()
+        self.dax_output_editor.moveCursor(QTextCursor.MoveOperation.Start)
+        if not self._dax_output_chunks:
+            self._finish_dax_output()
+            return
+        self._dax_output_cursor = cursor
+        self._dax_output_timer.start()
+
+    def _pump_dax_output(self) -> None:
+        cursor = self._dax_output_cursor
+        if cursor is None or not self._dax_output_chunks:
+            self._finish_dax_output()
+            return
+        cursor.joinPreviousEditBlock()
+        cursor.insertText(self._dax_output_chunks.popleft())
+        cursor.endEditBlock()
+        if not self._dax_output_chunks:
+            self._finish_dax_output()
+
+    def _finish_dax_output(self) -> None:
+        self._dax_output_timer.stop()
+        self._dax_output_chunks.clear()
+        self._dax_output_cursor = None
         self._set_dax_busy(False, "Generation complete.")
-        if self.dax_output_editor:
-            self.dax_output_editor.setPlainText(response)
 
     def _on_dax_generation_error(self, message: str) -> None:
+        self._dax_worker = None
         self._set_dax_busy(False, f"Generation failed: {message}")
         QMessageBox.critical(
             self,
@@ -1258,6 +1639,18 @@ class PowerQueryTab(QWidget):
             f"ChatGPT request failed:\n{message}",
         )
 
+    def shutdown(self) -> None:
+        """Stop background DAX work; the main window calls this before discarding the tab."""
+        # Drop this tab's queued chat request (the pool is shared); one already on the wire
+        # finishes in the background and its result is discarded instead of reaching a closed tab.
+        if self._dax_worker is not None:
+            self.dax_thread_pool.tryTake(self._dax_worker)
+            self._dax_worker.cancel()
+            self._dax_worker = None
+        self._dax_output_timer.stop()
+        self._dax_output_chunks.clear()
+        self._dax_output_cursor = None
+
     def _set_dax_busy(self, busy: bool, status: str = "") -> None:
         self._dax_busy = busy
         if self.dax_generate_button:
@@ -1766,7 +2159,7 @@ class PowerQueryTab(QWidget):
         self.query_editor.setEnabled(True)
         if self.query_editor.language() != language:
             self.query_editor.set_language(language)
-        self.query_editor.setPlainText(table_info.get("code_text") or "")
+        self.query_editor.setPlainText(_table_code_text(table_info))
 
         mode_value = (table_info.get("import_mode") or "").lower()
         idx = self.import_mode_combo.findData(mode_value)
@@ -3006,7 +3399,7 @@ class PowerQueryTab(QWidget):
             return "Measure"
         quoted = measure.get("quoted_name")
         if quoted is None:
-            quoted = not re.match(r"^[A-Za-z_][A-Za-z0-9_]*$", name)
+            quoted = not _SIMPLE_IDENTIFIER_RE.match(name)
         if quoted:
             escaped = name.replace("'", "''")
             return f"'{escaped}'"
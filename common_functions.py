@@ -2,18 +2,27 @@ import ast
 import copy
 import hashlib
 import json
+import math
+import mmap
 import os
 import re
+import tempfile
 import textwrap
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QStandardPaths
 from PyQt6.QtGui import QFont, QPalette, QColor
 from PyQt6.QtWidgets import QStyleFactory, QApplication
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
 def count_files(root_dir):
     total = 0
     for _, _, files in os.walk(root_dir):
@@ -224,6 +233,56 @@ def simple_hash(value):
     return alnum[:19]
 
 
+_ORJSON_INDENT_RE = re.compile(rb"(?m)^( +)")
+
+
+def _floats_match_stdlib(data: Any) -> bool:
+    """Return False if ``data`` holds a float orjson would write differently from ``json``."""
+    # orjson writes NaN/Infinity as null and 1e-05 as 0.00001, and depending on its version
+    # 1e16 as 1e16 rather than 1e+16; floats between those ranges match repr().
+    stack = [data]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, float):
+            if not math.isfinite(item) or abs(item) >= 1e16 or (item and abs(item) < 1e-4):
+                return False
+        elif isinstance(item, dict):
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple)):
+            stack.extend(item)
+    return True
+
+
+def dump_json_text(data: Any) -> str:
+    """
+    Serialize ``data`` the way ``json.dump(..., indent=4, ensure_ascii=False)`` would.
+
+    Uses orjson when it is installed (its two-space indent is widened to four spaces
+    so the files stay byte-compatible with Power BI Desktop), otherwise the stdlib.
+    Data orjson cannot reproduce exactly (non-finite, very small or very large floats,
+    non-string keys, oversized ints) goes through the stdlib.
+    """
+    if orjson is not None and _floats_match_stdlib(data):
+        try:
+            out = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+        except (TypeError, orjson.JSONEncodeError):
+            pass
+        else:
+            return _ORJSON_INDENT_RE.sub(lambda m: m.group(1) * 2, out).decode("utf-8")
+    return json.dumps(data, indent=4, ensure_ascii=False)
+
+
+def load_json_text(text: str) -> Any:
+    """Parse JSON text with orjson when it is installed, otherwise the stdlib."""
+    if orjson is not None:
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            # orjson is stricter (NaN, oversized ints); let the stdlib decide.
+            pass
+    return json.loads(text)
+
+
 # --- PBIP project backend ----------------------------------------------------
 
 
@@ -421,6 +480,87 @@ def _resolve_pbip_file(pbip_file: str | Path) -> Path:
     return pbip_path
 
 
+_TMDL_READ_WORKERS = 16
+_TABLES_CACHE_VERSION = 2
+# Large source texts are re-read from the table file when needed instead of being cached.
+_TABLES_CACHE_SKIPPED_KEYS = ("tmdl_text", "code_text")
+
+
+def _tables_cache_path(pbip_file: Path) -> Optional[Path]:
+    location = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.CacheLocation)
+    if not location:
+        return None
+    digest = hashlib.sha1(str(pbip_file).encode("utf-8")).hexdigest()
+    return Path(location) / "pbi_cleaner" / f"{digest}.json"
+
+
+def _tables_manifest(tables_dir: Path) -> List[List[Any]]:
+    """Name, mtime and size of every table file; any edit on disk changes it."""
+    manifest: List[List[Any]] = []
+    with os.scandir(tables_dir) as entries:
+        for entry in entries:
+            if entry.name.lower().endswith(".tmdl") and not entry.name.startswith(".") and entry.is_file():
+                stat = entry.stat()
+                manifest.append([entry.name, stat.st_mtime_ns, stat.st_size])
+    manifest.sort()
+    return manifest
+
+
+def _read_tables_cache(cache_path: Path, manifest: List[List[Any]]) -> Optional[Dict[str, Dict[str, Any]]]:
+    try:
+        cached = load_json_text(cache_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(cached, dict):
+        return None
+    if cached.get("version") != _TABLES_CACHE_VERSION or cached.get("manifest") != manifest:
+        return None
+    tables = cached.get("tables")
+    return tables if isinstance(tables, dict) else None
+
+
+def _write_tables_cache(
+    cache_path: Path,
+    manifest: List[List[Any]],
+    tables: Dict[str, Dict[str, Any]],
+) -> None:
+    cached_tables = {
+        name: {key: value for key, value in info.items() if key not in _TABLES_CACHE_SKIPPED_KEYS}
+        for name, info in tables.items()
+    }
+    payload = {"version": _TABLES_CACHE_VERSION, "manifest": manifest, "tables": cached_tables}
+    tmp_name: Optional[str] = None
+    try:
+        cache_path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        if orjson is not None:
+            data = orjson.dumps(payload)
+        else:
+            data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        # A unique temp name per writer, so two running instances never share a partial file.
+        with tempfile.NamedTemporaryFile(dir=cache_path.parent, suffix=".tmp", delete=False) as handle:
+            tmp_name = handle.name
+            handle.write(data)
+        os.replace(tmp_name, cache_path)
+        tmp_name = None
+    except (OSError, TypeError, ValueError):
+        # The cache only saves parsing time; a failed write just means a cold start.
+        pass
+    finally:
+        if tmp_name is not None:
+            try:
+                os.unlink(tmp_name)
+            except OSError:
+                pass
+
+
+def _load_table_tmdl(table_path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        content = table_path.read_text(encoding="utf-8")
+    except OSError:
+        return None
+    return _parse_table_tmdl(table_path, content)
+
+
 def _load_power_query_metadata(pbip_file: Path) -> PowerQueryMetadata:
     metadata = PowerQueryMetadata()
     try:
@@ -437,15 +577,26 @@ def _load_power_query_metadata(pbip_file: Path) -> PowerQueryMetadata:
         metadata.query_order = _parse_query_order(model_text)
         metadata.query_groups = _parse_query_groups(model_text)
 
+        manifest = _tables_manifest(tables_dir)
+        cache_path = _tables_cache_path(pbip_file)
+        cached_tables = _read_tables_cache(cache_path, manifest) if cache_path is not None else None
+        if cached_tables is not None:
+            metadata.tables = cached_tables
+            return metadata
+
         tables: Dict[str, Dict[str, Any]] = {}
-        for table_path in sorted(tables_dir.glob("*.tmdl")):
-            try:
-                content = table_path.read_text(encoding="utf-8")
-            except OSError:
-                continue
-            tables[table_path.stem] = _parse_table_tmdl(table_path, content)
+        table_paths = [tables_dir / name for name, _mtime, _size in manifest]
+        if table_paths:
+            # One small file per table: overlap the reads, then keep the sorted order.
+            with ThreadPoolExecutor(max_workers=min(_TMDL_READ_WORKERS, len(table_paths))) as executor:
+                parsed = list(executor.map(_load_table_tmdl, table_paths))
+            for table_path, table_info in zip(table_paths, parsed):
+                if table_info is not None:
+                    tables[table_path.stem] = table_info
 
         metadata.tables = tables
+        if cache_path is not None:
+            _write_tables_cache(cache_path, manifest, tables)
     except Exception as exc:  # pragma: no cover - defensive
         metadata.error = str(exc)
     return metadata
@@ -691,31 +842,33 @@ def _parse_table_measures(tmdl_text: str) -> Dict[str, Any]:
     }
 
 
+_TMDL_COLUMN_RE = re.compile(r'(?mi)^\s*column\s+(?:"([^"]+)"|([A-Za-z0-9_]+))\s*$')
+_TMDL_MODE_RE = re.compile(r"(?mi)^\s*mode\s*:\s*([^\r\n]+)")
+_TMDL_DATA_MODE_RE = re.compile(r'(?mi)^\s*annotation\s+PBI_DataMode\s*=\s*"?(?P<value>.*?)"?\s*$')
+_TMDL_PARTITION_RE = re.compile(r"(?mi)^\s*partition\s+[A-Za-z0-9_-]+\s*=\s*(m|calculated)\s*$")
+_TMDL_QUERY_GROUP_RE = re.compile(r"(?mi)^\s*queryGroup\s*:\s*([^\r\n]+)")
+_TMDL_QUERY_GROUP_LEGACY_RE = re.compile(r"(?mi)^\s*queryGroup\s+([^\r\n]+)")
+
+
 def _parse_table_tmdl(table_path: Path, tmdl_text: str) -> Dict[str, Any]:
-    column_pattern = re.compile(r'(?mi)^\s*column\s+(?:"([^"]+)"|([A-Za-z0-9_]+))\s*$')
     columns: List[str] = []
-    for match in column_pattern.finditer(tmdl_text):
+    for match in _TMDL_COLUMN_RE.finditer(tmdl_text):
         column = match.group(1) or match.group(2) or ""
         column = column.strip()
         if column:
             columns.append(column)
 
-    mode_match = re.search(r"(?mi)^\s*mode\s*:\s*([^\r\n]+)", tmdl_text)
+    mode_match = _TMDL_MODE_RE.search(tmdl_text)
     if mode_match:
         mode_value = mode_match.group(1).strip().lower()
     else:
-        data_mode_match = re.search(
-            r'(?mi)^\s*annotation\s+PBI_DataMode\s*=\s*"?(?P<value>.*?)"?\s*$',
-            tmdl_text,
-        )
+        data_mode_match = _TMDL_DATA_MODE_RE.search(tmdl_text)
         mode_value = data_mode_match.group("value").strip().lower() if data_mode_match else None
 
-    table_type_match = re.search(r"(?mi)^\s*partition\s+[A-Za-z0-9_-]+\s*=\s*(m|calculated)\s*$", tmdl_text)
+    table_type_match = _TMDL_PARTITION_RE.search(tmdl_text)
     table_type = table_type_match.group(1).lower() if table_type_match else "m"
 
-    query_group_match = re.search(r"(?mi)^\s*queryGroup\s*:\s*([^\r\n]+)", tmdl_text) or re.search(
-        r"(?mi)^\s*queryGroup\s+([^\r\n]+)", tmdl_text
-    )
+    query_group_match = _TMDL_QUERY_GROUP_RE.search(tmdl_text) or _TMDL_QUERY_GROUP_LEGACY_RE.search(tmdl_text)
     query_group = _normalize_group_path(query_group_match.group(1)) if query_group_match else None
 
     code_text = _extract_table_code(tmdl_text) or ""
@@ -739,6 +892,27 @@ def _parse_table_tmdl(table_path: Path, tmdl_text: str) -> Dict[str, Any]:
     }
 
 
+def _table_tmdl_text(table_info: Dict[str, Any]) -> str:
+    """Return the table's TMDL source, reading it from ``tmdl_path`` if it was not kept in memory."""
+    text = table_info.get("tmdl_text")
+    if text is None:
+        try:
+            text = Path(table_info["tmdl_path"]).read_text(encoding="utf-8")
+        except (KeyError, OSError, UnicodeDecodeError):
+            text = ""
+        table_info["tmdl_text"] = text
+    return text
+
+
+def _table_code_text(table_info: Dict[str, Any]) -> str:
+    """Return the table's M/DAX source, extracting it from the TMDL on first use."""
+    code = table_info.get("code_text")
+    if code is None:
+        code = _extract_table_code(_table_tmdl_text(table_info)) or ""
+        table_info["code_text"] = code
+    return code
+
+
 def _unescape_quoted(text: str) -> str:
     try:
         return text.encode("utf-8").decode("unicode_escape")
@@ -807,6 +981,16 @@ def _extract_table_code(tmdl_text: str) -> Optional[str]:
     return _strip_any_fence(result.strip())
 
 
+_DAX_READ_WORKERS = 16
+
+
+def _read_dax_file(dax_path: Path) -> Optional[str]:
+    try:
+        return dax_path.read_text(encoding="utf-8")
+    except OSError:
+        return None
+
+
 def _load_dax_queries_metadata(pbip_file: Path) -> DaxQueriesMetadata:
     metadata = DaxQueriesMetadata()
     try:
@@ -815,7 +999,7 @@ def _load_dax_queries_metadata(pbip_file: Path) -> DaxQueriesMetadata:
         if not json_path.is_file():
             raise FileNotFoundError(f"daxQueries.json not found under {dax_root}")
 
-        data = json.loads(json_path.read_text(encoding="utf-8"))
+        data = load_json_text(json_path.read_text(encoding="utf-8"))
         tab_order = data.get("tabOrder") or []
         if not isinstance(tab_order, list):
             raise ValueError("daxQueries.json missing a valid 'tabOrder' list.")
@@ -825,14 +1009,15 @@ def _load_dax_queries_metadata(pbip_file: Path) -> DaxQueriesMetadata:
         metadata.default_tab = default_tab if isinstance(default_tab, str) else None
 
         queries: Dict[str, str] = {}
-        for name in metadata.tab_order:
-            dax_path = dax_root / f"{name}.dax"
-            if not dax_path.is_file():
-                continue
-            try:
-                queries[name] = dax_path.read_text(encoding="utf-8")
-            except OSError:
-                continue
+        names = metadata.tab_order
+        if names:
+            # Overlap the per-file read latency (cold caches, synced/network folders).
+            paths = [dax_root / f"{name}.dax" for name in names]
+            with ThreadPoolExecutor(max_workers=min(_DAX_READ_WORKERS, len(paths))) as executor:
+                contents = list(executor.map(_read_dax_file, paths))
+            for name, code in zip(names, contents):
+                if code is not None:
+                    queries[name] = code
 
         metadata.queries = queries
     except Exception as exc:  # pragma: no cover - defensive
@@ -931,13 +1116,10 @@ def _compute_bookmark_usage(bookmarks: Dict[str, Dict[str, Any]], pages_dir: Pat
         for fname in files:
             if not fname.lower().endswith(".json"):
                 continue
-            path = Path(root) / fname
             try:
-                content = path.read_text(encoding="utf-8", errors="ignore")
+                matched = find_names_in_file(os.path.join(root, fname), remaining)
             except OSError:
                 continue
-
-            matched = {name for name in list(remaining) if name in content}
             if not matched:
                 continue
 
@@ -946,3 +1128,27 @@ def _compute_bookmark_usage(bookmarks: Dict[str, Dict[str, Any]], pages_dir: Pat
             remaining.difference_update(matched)
             if not remaining:
                 return
+
+
+_MMAP_SCAN_THRESHOLD = 64 * 1024
+
+
+def find_names_in_file(path: str | Path, names: Iterable[str]) -> Set[str]:
+    """
+    Return the subset of ``names`` that occur verbatim in the file at ``path``.
+
+    Files larger than 64KB are memory-mapped so the search runs directly over the
+    page cache instead of copying the whole file into a Python string first.
+    """
+    with open(path, "rb") as fh:
+        size = os.fstat(fh.fileno()).st_size
+        if size == 0:
+            return set()
+        if size < _MMAP_SCAN_THRESHOLD:
+            content = fh.read()
+            return {name for name in names if name.encode("utf-8") in content}
+        mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            return {name for name in names if mm.find(name.encode("utf-8")) != -1}
+        finally:
+            mm.close()
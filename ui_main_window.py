@@ -123,6 +123,8 @@ class MainWindow(QMainWindow):
         self._cursor_active = False
         self._is_loading_project = False
         self._pending_project_path: str | None = None
+        self._tables_tab: PowerQueryTab | None = None
+        self._dax_queries_tab: DAXQueryTab | None = None
 
         self.init_ui()
         self.setup_menu()
@@ -237,6 +239,7 @@ class MainWindow(QMainWindow):
         outer_layout.addStretch(1)
 
         start_widget.setLayout(outer_layout)
+        self._shutdown_tabs()
         self.setCentralWidget(start_widget)
         self.setup_shortcuts()
 
@@ -615,7 +618,10 @@ class MainWindow(QMainWindow):
         main_layout.addWidget(credit_label)
 
         main_widget.setLayout(main_layout)
+        self._shutdown_tabs()
         self.setCentralWidget(main_widget)
+        self._tables_tab = tables_tab
+        self._dax_queries_tab = dax_queries_tab
 
         self.cta_stack = None
         self.confirm_btn = None
@@ -623,6 +629,19 @@ class MainWindow(QMainWindow):
         self.loading_indicator = None
         return True
 
+    def _shutdown_tabs(self):
+        """Stop background work in the current tabs before they are replaced or the window closes."""
+        if self._tables_tab is not None:
+            self._tables_tab.shutdown()
+            self._tables_tab = None
+        if self._dax_queries_tab is not None:
+            self._dax_queries_tab.shutdown()
+            self._dax_queries_tab = None
+
+    def closeEvent(self, event):
+        self._shutdown_tabs()
+        super().closeEvent(event)
+
     def _legacy_load_main_tabs(self):
         """Legacy synchronous loader retained for reference."""
         pass